@@ -9,10 +9,10 @@ import io
 import json
 import os
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import pyarrow as pa
-from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi import Body, Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 
@@ -47,11 +47,16 @@ def get_db() -> DuckDBManager:
         # Get configuration from environment or use defaults
         db_path = os.environ.get("OPENATHENA_DB_PATH")
         catalog_path = os.environ.get("OPENATHENA_CATALOG_PATH", "catalog.yml")
-        threads = int(os.environ.get("OPENATHENA_THREADS", "4"))
+        threads = int(os.environ.get("OPENATHENA_THREADS", "0")) or None
         memory_limit = os.environ.get("OPENATHENA_MEMORY_LIMIT", "4GB")
         enable_caching = (
             os.environ.get("OPENATHENA_ENABLE_CACHING", "true").lower() == "true"
         )
+        max_connections = int(os.environ.get("OPENATHENA_MAX_CONNECTIONS", "4"))
+        metadata_cache_dir = os.environ.get("OPENATHENA_METADATA_CACHE", ".oa_cache")
+        result_cache_entries = int(
+            os.environ.get("OPENATHENA_RESULT_CACHE_ENTRIES", "0")
+        )
 
         # Initialize database manager
         db_manager = DuckDBManager(
@@ -60,11 +65,19 @@ def get_db() -> DuckDBManager:
             threads=threads,
             memory_limit=memory_limit,
             enable_caching=enable_caching,
+            max_connections=max_connections,
+            metadata_cache_dir=metadata_cache_dir,
+            result_cache_entries=result_cache_entries,
         )
 
         # Configure S3 credentials from environment
         db_manager.configure_s3_credentials()
 
+        # Warm metadata caches for frequently queried files
+        warm_urls = os.environ.get("OPENATHENA_WARM_CACHE")
+        if warm_urls:
+            db_manager.warm_cache(u.strip() for u in warm_urls.split(",") if u.strip())
+
     return db_manager
 
 
@@ -78,6 +91,27 @@ async def root() -> Dict[str, str]:
     }
 
 
+def _arrow_ipc_stream(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """
+    Encode record batches as an Arrow IPC stream, one chunk per batch.
+
+    Args:
+        reader: Record batch reader to drain
+
+    Yields:
+        Encoded IPC stream bytes
+    """
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # Closing the writer appends the end-of-stream marker
+    yield sink.getvalue()
+
+
 @app.post("/sql", tags=["Queries"])
 async def execute_sql(
     request: Request, db: DuckDBManager = Depends(get_db), format: str = "arrow"
@@ -103,6 +137,16 @@ async def execute_sql(
     try:
         # Execute query
         print(f"Executing SQL query: {sql}")
+
+        if format.lower() not in ("csv", "json"):
+            # Return Arrow format (default), streamed one batch at a time
+            reader = db.execute_query_arrow(sql)
+            print("Streaming Arrow response")
+            return StreamingResponse(
+                _arrow_ipc_stream(reader),
+                media_type="application/vnd.apache.arrow.stream",
+            )
+
         result = db.execute_query(sql)
         print("Query executed successfully")
 
@@ -113,7 +157,7 @@ async def execute_sql(
             result.to_csv(csv_data)
             print("Returning CSV response")
             return StreamingResponse(iter([csv_data.getvalue()]), media_type="text/csv")
-        elif format.lower() == "json":
+        else:
             # Return JSON format
             print("Converting result to JSON")
             try:
@@ -127,29 +171,6 @@ async def execute_sql(
                     status_code=500,
                     detail=f"Error converting result to JSON: {str(json_error)}",
                 )
-        else:
-            # Return Arrow format (default)
-            print("Converting result to Arrow format")
-            try:
-                table = result.arrow()
-                batch_reader = pa.RecordBatchReader.from_batches(
-                    table.schema, table.to_batches()
-                )
-                sink = io.BytesIO()
-                with pa.ipc.new_stream(sink, batch_reader.schema) as writer:
-                    for batch in batch_reader:
-                        writer.write_batch(batch)
-
-                print("Returning Arrow response")
-                return StreamingResponse(
-                    io.BytesIO(sink.getvalue()),
-                    media_type="application/vnd.apache.arrow.stream",
-                )
-            except Exception as arrow_error:
-                print(f"Error converting to Arrow format: {arrow_error}")
-                # Fallback to JSON if Arrow conversion fails
-                json_data = {"data": result.to_df().to_dict(orient="records")}
-                return JSONResponse(content=json_data)
     except Exception as e:
         import traceback
 
@@ -235,10 +256,57 @@ async def add_table(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/admin/warm", tags=["Admin"])
+async def warm_cache(
+    urls: List[str] = Body(..., embed=True), db: DuckDBManager = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Warm DuckDB's metadata caches for a set of files.
+
+    Args:
+        urls: File URLs to pre-read
+        db: DuckDB manager instance
+
+    Returns:
+        Number of files warmed
+    """
+    return {"status": "ok", "warmed": db.warm_cache(urls)}
+
+
+@app.post("/admin/reset-session", tags=["Admin"])
+async def reset_session(db: DuckDBManager = Depends(get_db)) -> Dict[str, str]:
+    """
+    Drop temporary objects, session settings and open transactions.
+
+    Once a client creates a temporary table or runs SET or USE, every query
+    runs on a single connection; this restores concurrent reads.
+
+    Args:
+        db: DuckDB manager instance
+
+    Returns:
+        Success message
+    """
+    db.reset_session()
+    return {"status": "ok", "message": "Session state reset"}
+
+
 @app.get("/health", tags=["General"])
-async def health_check() -> Dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "ok"}
+async def health_check(s3_bucket: Optional[str] = None) -> Dict[str, str]:
+    """
+    Health check endpoint.
+
+    Args:
+        s3_bucket: Optional bucket to probe for S3 reachability
+
+    Returns:
+        Health status
+    """
+    if s3_bucket is None:
+        return {"status": "ok"}
+
+    s3_status = "ok" if get_db().verify_s3(s3_bucket) else "unreachable"
+    return {"status": "ok", "s3": s3_status}
 
 
 def start():
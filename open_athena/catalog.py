@@ -8,17 +8,53 @@ import logging
 import os
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml bindings not available
+    from yaml import SafeLoader
+
 # Import the OpenS3 file proxy
-from open_athena.opens3_file_proxy import get_proxy_instance, initialize_proxy
+from open_athena.opens3_file_proxy import (
+    get_proxy_instance,
+    initialize_proxy,
+    sql_path_literal,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parsed catalogs by absolute path, with the (mtime, size) they were read at
+_PARSED_CATALOGS: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+def _read_catalog(cat_path: str) -> Any:
+    """
+    Parse a catalog file, reusing the previous parse while the file is unchanged.
+
+    The returned object is shared between callers and must not be modified.
+
+    Args:
+        cat_path: Path to the catalog YAML file
+
+    Returns:
+        Parsed catalog contents
+    """
+    stat = os.stat(cat_path)
+    key = os.path.abspath(cat_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _PARSED_CATALOGS.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    cfg = yaml.load(Path(cat_path).read_bytes(), Loader=SafeLoader)
+    _PARSED_CATALOGS[key] = (signature, cfg)
+    return cfg
+
 
 def load_catalog(con, cat_path: str = "catalog.yml") -> None:
     """
@@ -32,13 +68,15 @@ def load_catalog(con, cat_path: str = "catalog.yml") -> None:
         print(f"Warning: Catalog file {cat_path} not found.")
         return
 
-    cfg = yaml.safe_load(Path(cat_path).read_text())
+    # Managers created repeatedly for the same catalog skip the YAML parse
+    cfg = _read_catalog(cat_path)
     if not cfg:
         print(f"Warning: Catalog file {cat_path} is empty or invalid.")
         return
 
-    # Initialize the OpenS3 file proxy
-    proxy = initialize_proxy()
+    # Initialize the OpenS3 file proxy, downloading the files referenced by
+    # the catalog's queries concurrently before the views are created
+    proxy = initialize_proxy(cfg)
     logger.info("OpenS3 file proxy initialized for catalog loading")
 
     for tbl, meta in cfg.items():
@@ -72,10 +110,10 @@ def load_catalog(con, cat_path: str = "catalog.yml") -> None:
                 view_query = f"CREATE OR REPLACE VIEW {safe_tbl} AS {processed_query}"
                 con.sql(view_query)
 
-                logger.info(f"✅ Created view for table '{tbl}' using proxy")
+                logger.info("✅ Created view for table '%s' using proxy", tbl)
                 print(f"✅ Created view for table '{tbl}' using local file proxy")
             except Exception as e:
-                logger.error(f"❌ Error creating view for table '{tbl}': {e}")
+                logger.error("❌ Error creating view for table '%s': %s", tbl, e)
                 print(f"❌ Error creating view for table '{tbl}': {e}")
                 # Create a dummy view with error information as fallback
                 # Prepare safe error message by escaping single quotes
@@ -98,9 +136,9 @@ def load_catalog(con, cat_path: str = "catalog.yml") -> None:
             safe_tbl = f'"{tbl}"' if "-" in tbl else tbl
 
             # Use our proxy to create a local path instead of S3 path
-            # For wildcard paths, we'll list objects and download the first one as a sample
-            logger.info(f"Listing objects in bucket {bucket} with prefix {prefix}")
-            objects = proxy.list_objects(bucket)
+            # For wildcard paths, we'll list objects and download every match
+            logger.info("Listing objects in bucket %s with prefix %s", bucket, prefix)
+            objects = proxy.list_objects(bucket, prefix=prefix)
 
             if objects:
                 # Filter by file format and prefix
@@ -121,32 +159,36 @@ def load_catalog(con, cat_path: str = "catalog.yml") -> None:
                         matching_objects.append(
                             {"name": name}
                         )  # Standardize to dict with 'name' key
-                        logger.info(f"Added matching object: {name}")
+                        logger.info("Added matching object: %s", name)
 
                 if matching_objects:
-                    # Download the first matching object
-                    first_object = matching_objects[0]["name"]
-                    local_path = proxy.download_file(bucket, first_object)
+                    # Download every matching object; several files come back
+                    # as a list that DuckDB scans together
+                    local_path = proxy.download_matches(
+                        bucket, [obj["name"] for obj in matching_objects]
+                    )
 
                     if local_path:
-                        # Double escape the apostrophes in the path for SQL
-                        sql_safe_path = local_path.replace("'", "''")
+                        # Quote the path (or list of paths) for SQL
+                        sql_safe_path = sql_path_literal(local_path)
 
                         # Create the view using the local file
                         if file_format.lower() == "parquet":
                             con.sql(
-                                f"CREATE OR REPLACE VIEW {safe_tbl} AS SELECT * FROM read_parquet('{sql_safe_path}');"
+                                f"CREATE OR REPLACE VIEW {safe_tbl} AS SELECT * FROM read_parquet({sql_safe_path});"
                             )
                         elif file_format.lower() == "csv":
                             con.sql(
-                                f"CREATE OR REPLACE VIEW {safe_tbl} AS SELECT * FROM read_csv_auto('{sql_safe_path}');"
+                                f"CREATE OR REPLACE VIEW {safe_tbl} AS SELECT * FROM read_csv_auto({sql_safe_path});"
                             )
                         else:
                             # Other formats as needed
                             raise ValueError(f"Unsupported file format: {file_format}")
 
                         logger.info(
-                            f"✅ Created view for table '{tbl}' using proxy with local file {local_path}"
+                            "✅ Created view for table '%s' using proxy with local file %s",
+                            tbl,
+                            local_path,
                         )
                         print(
                             f"✅ Created view for table '{tbl}' using local file proxy"
@@ -161,7 +203,7 @@ def load_catalog(con, cat_path: str = "catalog.yml") -> None:
                 raise Exception(f"No objects found in bucket {bucket}")
 
         except Exception as e:
-            logger.error(f"❌ Error creating view for table '{tbl}': {e}")
+            logger.error("❌ Error creating view for table '%s': %s", tbl, e)
             print(f"❌ Error creating view for table '{tbl}': {e}")
             # Create a dummy view with no data as a fallback
             # Prepare safe error message by escaping single quotes
@@ -186,7 +228,7 @@ def get_catalog_tables(cat_path: str = "catalog.yml") -> Dict[str, Any]:
     if not os.path.exists(cat_path):
         return {}
 
-    return yaml.safe_load(Path(cat_path).read_text())
+    return yaml.load(Path(cat_path).read_bytes(), Loader=SafeLoader)
 
 
 def create_catalog_table(
@@ -213,7 +255,7 @@ def create_catalog_table(
     if not os.path.exists(cat_path):
         catalog = {}
     else:
-        catalog = yaml.safe_load(Path(cat_path).read_text()) or {}
+        catalog = yaml.load(Path(cat_path).read_bytes(), Loader=SafeLoader) or {}
 
     # Add or update table definition
     catalog[table_name] = {"bucket": bucket, "prefix": prefix, "format": file_format}
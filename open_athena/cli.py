@@ -8,12 +8,60 @@ import argparse
 import json
 import os
 import sys
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
 from open_athena import __version__
 from open_athena.client import OpenAthenaClient
+from open_athena.validators import validate_row_limit
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
+
+try:
+    from tabulate import tabulate
+except ImportError:  # tabulate is an optional speedup
+    tabulate = None
+
+# Default number of rows rendered by the table output format
+DEFAULT_TABLE_LIMIT = 1000
+
+
+def _json_default(value: Any) -> str:
+    """Encode values JSON has no type for, the same way for both encoders."""
+    if hasattr(value, "isoformat"):
+        # Dates, times and timestamps as ISO 8601
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps_json(data: Any) -> bytes:
+    """
+    Serialize data as indented JSON, using orjson when it is available.
+
+    Both encoders produce the same output, so installing the optional
+    speedup never changes what is written.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(data, indent=2, default=_json_default, ensure_ascii=False).encode(
+        "utf-8"
+    )
+
+
+def _json_records(data: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to records, with missing values (NaN, NaT) as None."""
+    return data.astype(object).where(data.notna(), None).to_dict(orient="records")
 
 
 def parse_args():
@@ -39,6 +87,13 @@ def parse_args():
         help="Output format (default: table)",
     )
 
+    parser.add_argument(
+        "--limit",
+        type=validate_row_limit,
+        default=DEFAULT_TABLE_LIMIT,
+        help=f"Maximum rows shown by the table format, 0 for all (default: {DEFAULT_TABLE_LIMIT})",
+    )
+
     # Server configuration
     parser.add_argument(
         "--server",
@@ -81,35 +136,64 @@ def parse_args():
 def read_query_from_file(filepath: str) -> str:
     """Read SQL query from a file."""
     try:
-        with open(filepath, "r") as f:
-            return f.read().strip()
+        # Read to EOF rather than trusting st_size, which is 0 for pipes,
+        # FIFOs and /dev/stdin
+        with Path(filepath).open("rb") as f:
+            data = f.read()
+        return data.decode("utf-8").strip()
     except Exception as e:
         print(f"Error reading query file: {e}", file=sys.stderr)
         sys.exit(1)
 
 
-def write_output(data: Any, output_path: Optional[str], output_format: str) -> None:
+def _render_table(data: pd.DataFrame, limit: Optional[int]) -> str:
+    """Render a DataFrame as a text table, previewing at most ``limit`` rows."""
+    preview = data.head(limit) if limit else data
+    if tabulate is not None:
+        output = tabulate(
+            preview.itertuples(index=False),
+            headers=list(preview.columns),
+            tablefmt="simple",
+        )
+    else:
+        output = preview.to_string(index=False)
+
+    hidden = len(data) - len(preview)
+    if hidden:
+        rows = "row" if hidden == 1 else "rows"
+        output += f"\n... ({hidden} more {rows}, use --limit to show more)"
+    return output
+
+
+def write_output(
+    data: Any,
+    output_path: Optional[str],
+    output_format: str,
+    limit: Optional[int] = None,
+) -> None:
     """Write query results to output."""
     if isinstance(data, pd.DataFrame):
         if output_format == "csv":
             output = data.to_csv(index=False)
         elif output_format == "json":
-            output = data.to_json(orient="records", indent=2)
+            output = _dumps_json(_json_records(data))
         else:  # table
-            output = data.to_string(index=False)
+            output = _render_table(data, limit)
     else:
         # Handle non-DataFrame output (like catalog info)
         if output_format == "json":
-            output = json.dumps(data, indent=2)
+            output = _dumps_json(data)
         else:
             output = str(data)
 
     if output_path:
-        with open(output_path, "w") as f:
+        # JSON is already encoded, so write it without a second encode pass
+        mode = "wb" if isinstance(output, bytes) else "w"
+        with open(output_path, mode) as f:
             f.write(output)
         print(f"Results written to {output_path}")
     else:
-        print(output)
+        print(output.decode("utf-8") if isinstance(output, bytes) else output)
 
 
 def main():
@@ -175,7 +259,7 @@ def main():
     if query:
         # Execute query
         df = client.execute_query(query)
-        write_output(df, args.output, args.format)
+        write_output(df, args.output, args.format, args.limit)
     else:
         # No action specified
         print(
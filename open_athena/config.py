@@ -4,6 +4,7 @@ Configuration module for OpenAthena.
 This module handles loading configuration from environment variables and config files.
 """
 
+import functools
 import os
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -11,6 +12,11 @@ from typing import Any, Dict, Optional
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml bindings not available
+    from yaml import SafeLoader
+
 # Load environment variables from .env file if it exists
 load_dotenv()
 
@@ -29,7 +35,9 @@ class Config:
 
         # Load from config file if provided
         if config_path and os.path.exists(config_path):
-            self.config_data = yaml.safe_load(Path(config_path).read_text()) or {}
+            self.config_data = (
+                yaml.load(Path(config_path).read_bytes(), Loader=SafeLoader) or {}
+            )
 
         # Setup default configuration
         self._setup_defaults()
@@ -46,7 +54,8 @@ class Config:
         # Database defaults
         self.config_data["database"].setdefault("path", None)  # In-memory by default
         self.config_data["database"].setdefault("catalog_path", "catalog.yml")
-        self.config_data["database"].setdefault("threads", 4)
+        # None lets DuckDBManager size the thread count from the CPU cores
+        self.config_data["database"].setdefault("threads", None)
         self.config_data["database"].setdefault("memory_limit", "4GB")
         self.config_data["database"].setdefault("enable_caching", True)
 
@@ -140,22 +149,18 @@ class Config:
         return value
 
 
-# Global configuration instance
-_config_instance = None
-
-
+@functools.lru_cache(maxsize=None)
 def get_config(config_path: Optional[str] = None) -> Config:
     """
     Get or initialize the global configuration instance.
 
+    Instances are cached per ``config_path``; call ``get_config.cache_clear()``
+    to force the configuration to be re-read.
+
     Args:
         config_path: Path to configuration YAML file (optional)
 
     Returns:
         Configuration instance
     """
-    global _config_instance
-    if _config_instance is None:
-        _config_instance = Config(config_path)
-
-    return _config_instance
+    return Config(config_path)
@@ -5,13 +5,190 @@ This module provides functionality for interacting with DuckDB and configuring
 the database connection to work with OpenS3.
 """
 
+import logging
 import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
-
-import duckdb
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from open_athena.catalog import load_catalog
+from open_athena.opens3_file_proxy import invalidate_resolved_urls
+from open_athena.validators import (
+    validate_memory_limit,
+    validate_region,
+    validate_threads,
+)
+
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Endpoints on loopback or private networks are treated as OpenS3 servers.
+# Host names must match in full, so e.g. localhost.example.com does not count
+_LOCAL_ENDPOINT_RE = re.compile(
+    r"(?:^|//)(?:(?:localhost|127\.0\.0\.1)(?![\w.-])"
+    r"|10\.\d|192\.168\.\d|172\.(?:1[6-9]|2\d|3[01])\.\d)"
+)
+_SCHEME_RE = re.compile(r"^https?://")
+
+
+def _load_duckdb() -> Any:
+    """Import DuckDB on first use so importing this module stays cheap."""
+    import duckdb
+
+    return duckdb
+
+
+# Plain-dict snapshot of the environment; os.environ lookups decode values on
+# every access, which adds up on the credential refresh path
+_ENV: Dict[str, str] = dict(os.environ)
+
+
+def _refresh_env() -> None:
+    """Re-read the environment snapshot, e.g. after a .env file was loaded."""
+    _ENV.clear()
+    _ENV.update(os.environ)
+
+
+def _first_env(*names: str, env: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """Return the first non-empty environment variable among ``names``."""
+    if env is None:
+        env = _ENV
+    for name in names:
+        value = env.get(name)
+        if value:
+            return value
+    return None
+
+
+def _parse_statements(sql: str) -> Optional[List[Any]]:
+    """Split SQL text into DuckDB statements, or None if it does not parse."""
+    try:
+        return _load_duckdb().extract_statements(sql)
+    except Exception:
+        # Running the text on the writer reports the syntax error
+        return None
+
+
+def _is_read_only(statements: Optional[List[Any]]) -> bool:
+    """
+    Check whether parsed SQL can run on a pooled read connection.
+
+    Only a single SELECT qualifies; DESCRIBE, SHOW, SUMMARIZE and PRAGMA
+    shortcuts parse as one. Multi-statement text, CTEs wrapping DML,
+    transaction control and unparseable text all go to the writer.
+    """
+    return (
+        statements is not None
+        and len(statements) == 1
+        and statements[0].type == _load_duckdb().StatementType.SELECT
+    )
+
+
+# Temporary objects only exist on the connection that created them; SET, RESET
+# and USE, which are likewise connection-local, parse as SET statements
+_TEMP_OBJECT_RE = re.compile(
+    r"^\s*create\s+(?:or\s+replace\s+)?temp(?:orary)?\b", re.IGNORECASE
+)
+# Transaction control statements that open a transaction (BEGIN, START)
+_BEGIN_RE = re.compile(r"^\s*(?:begin|start)\b", re.IGNORECASE)
+
+
+def _sql_literal(value: Union[str, bool]) -> str:
+    """Render a setting value as a SQL literal."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "'{}'".format(str(value).replace("'", "''"))
+
+
+def _closing_reader(
+    reader: "pa.RecordBatchReader", conn: "duckdb.DuckDBPyConnection"
+) -> "pa.RecordBatchReader":
+    """Wrap a record batch reader so its connection is closed once drained."""
+    import pyarrow as pa
+
+    def batches() -> Iterator["pa.RecordBatch"]:
+        try:
+            yield from reader
+        finally:
+            conn.close()
+
+    return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+
+# Table functions used to warm the cache, keyed by file extension
+_WARM_READERS = {"csv": "read_csv_auto", "json": "read_json_auto"}
+
+
+# Sentinel recording that httpfs was verified for the installed DuckDB build
+HTTPFS_SENTINEL = Path.home() / ".cache" / "openathena" / "httpfs_ok"
+
+
+# Extension directories httpfs was installed into by this process
+_HTTPFS_INSTALLED: Set[str] = set()
+
+
+def _extension_directory(conn: "duckdb.DuckDBPyConnection") -> str:
+    """Return the directory DuckDB installs extensions into."""
+    configured = conn.execute(
+        "SELECT current_setting('extension_directory')"
+    ).fetchone()[0]
+    return configured or str(Path.home() / ".duckdb" / "extensions")
+
+
+def _httpfs_verified() -> bool:
+    """Check whether httpfs was verified since DuckDB was last installed."""
+    try:
+        return HTTPFS_SENTINEL.stat().st_mtime >= os.path.getmtime(
+            _load_duckdb().__file__
+        )
+    except OSError:
+        return False
+
+
+def _mark_httpfs_verified() -> None:
+    """Record a successful httpfs verification for later processes."""
+    try:
+        HTTPFS_SENTINEL.parent.mkdir(parents=True, exist_ok=True)
+        HTTPFS_SENTINEL.touch()
+    except OSError:
+        pass  # Caching the verification is best-effort only
+
+
+# Databases opened from a file, shared so repeated opens of the same path
+# reuse one instance instead of contending for the file lock
+_INSTANCE_CACHE: Dict[str, "duckdb.DuckDBPyConnection"] = {}
+_INSTANCE_CACHE_LOCK = threading.Lock()
+
+
+def _get_or_create_database(database_path: str) -> "duckdb.DuckDBPyConnection":
+    """Return the cached root connection for a database file, opening it once."""
+    key = os.path.abspath(database_path)
+    with _INSTANCE_CACHE_LOCK:
+        db = _INSTANCE_CACHE.get(key)
+        if db is None:
+            db = _INSTANCE_CACHE[key] = _load_duckdb().connect(key)
+        return db
 
 
 class DuckDBManager:
@@ -21,9 +198,13 @@ class DuckDBManager:
         self,
         database_path: Optional[str] = None,
         catalog_path: str = "catalog.yml",
-        threads: int = 4,
+        threads: Optional[int] = None,
         memory_limit: str = "4GB",
         enable_caching: bool = True,
+        max_connections: int = 4,
+        metadata_cache_dir: str = ".oa_cache",
+        result_cache_entries: int = 0,
+        result_cache_bytes: int = 256 * 1024 * 1024,
     ):
         """
         Initialize DuckDB connection and configure for OpenS3.
@@ -31,14 +212,40 @@ class DuckDBManager:
         Args:
             database_path: Path to persistent database file or None for in-memory
             catalog_path: Path to catalog YAML file
-            threads: Number of threads to use for query execution
+            threads: Number of threads to use for query execution; defaults to
+                the number of CPU cores, capped at 32
             memory_limit: Memory limit for DuckDB
             enable_caching: Whether to enable result caching
+            max_connections: Number of pooled connections used to run queries
+            metadata_cache_dir: Directory DuckDB uses for spilled and cached data
+            result_cache_entries: Number of read query results to keep in memory;
+                0 disables the result cache
+            result_cache_bytes: Memory budget for cached results
         """
         self.database_path = database_path
         self.catalog_path = catalog_path
+        self._httpfs_loaded = False
+
+        # Pick up variables set since import (CLI overrides, .env files)
+        _refresh_env()
+
+        # DuckDB scales poorly past ~32 threads on a single query
+        self.threads = validate_threads(threads or min(32, os.cpu_count() or 4))
+        # The thread count is database-wide, so per-query overrides are serialized
+        self._threads_lock = threading.Lock()
+
+        # Credentials are re-applied before short-lived (STS) tokens expire;
+        # a TTL of 0 disables the refresh
+        self._s3_args: Optional[Dict[str, Any]] = None
+        self._secret_ttl = int(_ENV.get("OPENATHENA_S3_TTL", "900"))
+        self._last_secret_refresh = time.monotonic()
+        self._secret_lock = threading.Lock()
         self.connection = self._initialize_connection(
-            database_path, threads, memory_limit, enable_caching
+            database_path,
+            self.threads,
+            validate_memory_limit(memory_limit),
+            enable_caching,
+            metadata_cache_dir,
         )
 
         # Install and load httpfs extension for S3 access
@@ -47,56 +254,131 @@ class DuckDBManager:
         # Load catalog if it exists
         self._load_catalog()
 
+        # Child connections share the database but not its query lock, so
+        # concurrent reads do not serialize on a single connection. DuckDB
+        # supports one writer at a time, so writes go through a single
+        # dedicated connection instead.
+        self._read_pool: "queue.Queue[duckdb.DuckDBPyConnection]" = queue.Queue()
+        for _ in range(max(1, max_connections)):
+            self._read_pool.put(self._init_conn(self.connection.cursor()))
+        self._write_conn = self._init_conn(self.connection.cursor())
+        self._write_lock = threading.Lock()
+        # Temporary tables, SET and USE only apply to the writer they ran on,
+        # so once one has run every later statement goes through the writer.
+        # The same holds while a transaction is open, so its statements see
+        # its own uncommitted writes. The manager is shared by every client,
+        # so this serializes all of them until reset_session() is called.
+        self._session_pinned = False
+        self._in_transaction = False
+        # Results are handed back on a cursor private to the calling thread,
+        # see _wrap_result()
+        self._result_cursors = threading.local()
+
+        # Results of read queries, keyed by (data version, SQL). The version is
+        # bumped on catalog reloads and writes, which invalidates every entry.
+        self._data_version = 0
+        self._result_cache: "OrderedDict[Tuple[int, str], pa.Table]" = OrderedDict()
+        self._result_cache_entries = result_cache_entries
+        self._result_cache_bytes = result_cache_bytes
+        self._result_cache_size = 0
+        self._result_cache_lock = threading.Lock()
+
     def _initialize_connection(
         self,
         database_path: Optional[str],
         threads: int,
         memory_limit: str,
         enable_caching: bool,
-    ) -> duckdb.DuckDBPyConnection:
+        metadata_cache_dir: Optional[str] = None,
+    ) -> "duckdb.DuckDBPyConnection":
         """Initialize DuckDB connection with performance settings."""
-        # Create connection (in-memory or file-based)
-        conn = duckdb.connect(database_path) if database_path else duckdb.connect()
-
-        # Configure performance settings
-        conn.sql(f"PRAGMA threads={threads};")
-        conn.sql(f"PRAGMA memory_limit='{memory_limit}';")
+        # File-backed databases are shared through the instance cache and used
+        # via a child connection; in-memory databases stay private
+        if database_path and database_path != ":memory:":
+            conn = _get_or_create_database(database_path).cursor()
+        else:
+            conn = _load_duckdb().connect()
 
+        # Configure performance settings in a single round-trip. DuckDB only
+        # binds parameters in the last statement of a script, so the free-form
+        # memory limit goes last and the thread count is validated as an int
+        pragmas = f"PRAGMA threads={int(threads)};"
         if enable_caching:
-            conn.sql("PRAGMA enable_object_cache=true;")
+            # Cache Parquet metadata and HTTP object metadata between queries
+            pragmas += (
+                " PRAGMA enable_object_cache=true;"
+                " SET enable_http_metadata_cache=true;"
+            )
+        conn.execute(pragmas + " SET memory_limit=?;", [memory_limit])
+        if metadata_cache_dir:
+            conn.execute("SET temp_directory=?", [metadata_cache_dir])
 
         return conn
 
     def _initialize_httpfs(self) -> None:
         """Install and load httpfs extension for S3 access."""
         try:
-            # First check if httpfs is already installed
-            try:
-                self.connection.sql("LOAD httpfs;")
-                print("✅ Loaded existing httpfs extension for S3 access")
-            except Exception:
-                # If loading fails, try installing it first
-                self.connection.sql("INSTALL httpfs; LOAD httpfs;")
-                print("✅ Installed and loaded httpfs extension for S3 access")
+            # INSTALL checks the filesystem (and the network on first use), so
+            # it runs once per extension directory; LOAD is needed per database
+            ext_dir = _extension_directory(self.connection)
+            if ext_dir not in _HTTPFS_INSTALLED:
+                self.connection.execute("INSTALL httpfs")
+                _HTTPFS_INSTALLED.add(ext_dir)
+            self.connection.execute("LOAD httpfs")
+            self._httpfs_loaded = True
+            logger.debug("Loaded httpfs extension for S3 access")
+
+            # Verification only needs to run once per DuckDB installation
+            if _httpfs_verified():
+                return
 
             # Verify httpfs is properly installed by testing a basic function
             try:
                 self.connection.sql("SELECT httpfs_version() AS version")
-                print("✅ Verified httpfs extension is working properly")
+                _mark_httpfs_verified()
+                logger.debug("Verified httpfs extension is working properly")
             except Exception as verify_error:
-                print(f"⚠️ httpfs installed but verification failed: {verify_error}")
-                print("   This might affect your ability to connect to OpenS3")
+                logger.warning(
+                    "httpfs installed but verification failed: %s. "
+                    "This might affect your ability to connect to OpenS3",
+                    verify_error,
+                )
         except Exception as e:
-            print(f"❌ Error loading httpfs extension: {e}")
-            print("   Without httpfs, OpenAthena cannot connect to OpenS3.")
-            print(
-                "   Please ensure you have internet connectivity to download extensions."
-            )
-            print(
-                "   Or verify that DuckDB has permission to access the extension directory."
+            logger.error(
+                "Error loading httpfs extension: %s. Without httpfs, OpenAthena "
+                "cannot connect to OpenS3. Please ensure you have internet "
+                "connectivity to download extensions, or verify that DuckDB has "
+                "permission to access the extension directory.",
+                e,
             )
             # We don't re-raise as we want to continue initialization
 
+    def _init_conn(
+        self, conn: "duckdb.DuckDBPyConnection"
+    ) -> "duckdb.DuckDBPyConnection":
+        """Prepare a pooled connection for use."""
+        # PRAGMAs and S3 settings are database-wide in DuckDB, so cursors pick
+        # them up from the root connection; only the extension is loaded here
+        if self._httpfs_loaded:
+            conn.execute("LOAD httpfs")
+        return conn
+
+    @contextmanager
+    def acquire(self) -> Iterator["duckdb.DuckDBPyConnection"]:
+        """
+        Check a read connection out of the pool for the duration of a block.
+
+        Blocks until a connection is available when all are in use.
+
+        Yields:
+            DuckDB connection sharing this manager's database
+        """
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
     def _load_catalog(self) -> None:
         """Load the catalog if it exists."""
         if os.path.exists(self.catalog_path):
@@ -104,19 +386,255 @@ class DuckDBManager:
 
     def reload_catalog(self) -> None:
         """Reload the catalog configuration."""
+        # Resolve the catalog's OpenS3 URLs again so changed objects and new
+        # wildcard matches are picked up
+        invalidate_resolved_urls()
         self._load_catalog()
+        self._invalidate_results()
+
+    def _invalidate_results(self) -> None:
+        """Drop cached query results after the underlying data changed."""
+        with self._result_cache_lock:
+            self._data_version += 1
+            self._result_cache.clear()
+            self._result_cache_size = 0
+
+    def _cache_result(self, key: Tuple[int, str], table: "pa.Table") -> None:
+        """Store a query result, evicting the least recently used entries."""
+        if table.nbytes > self._result_cache_bytes:
+            return
+
+        with self._result_cache_lock:
+            # Results computed before an invalidation must not be cached
+            if key[0] != self._data_version or key in self._result_cache:
+                return
+            self._result_cache[key] = table
+            self._result_cache_size += table.nbytes
+            while (
+                len(self._result_cache) > self._result_cache_entries
+                or self._result_cache_size > self._result_cache_bytes
+            ):
+                _, evicted = self._result_cache.popitem(last=False)
+                self._result_cache_size -= evicted.nbytes
 
-    def execute_query(self, query: str) -> duckdb.DuckDBPyRelation:
+    def execute_query(
+        self, query: str, threads: Optional[int] = None
+    ) -> "duckdb.DuckDBPyRelation":
         """
         Execute a SQL query against DuckDB.
 
+        A single SELECT runs on a pooled connection; anything else, including
+        multi-statement text and transaction control, runs on a single writer.
+        While a transaction is open, and after the first statement creating a
+        temporary object or running SET or USE (which only affect the
+        connection that ran them), every query runs on the writer, trading
+        concurrent reads for the single-connection behavior callers expect.
+        This applies to every caller of the manager until reset_session().
+
+        Args:
+            query: SQL query to execute
+            threads: Optional thread count for this query only. The setting is
+                database-wide, so the query is run to completion before the
+                default is restored.
+
+        Returns:
+            DuckDB relation over the materialized result, or None for
+            statements that produce no result
+        """
+        self._maybe_refresh_secrets()
+        statements = _parse_statements(query)
+        if self._pinned_to_writer() or not _is_read_only(statements):
+            table = self._run_on_writer(
+                statements, lambda conn: self._run_query(conn, query, threads)
+            )
+            return None if table is None else self._wrap_result(table)
+
+        if not self._result_cache_entries or threads:
+            with self.acquire() as conn:
+                table = self._run_query(conn, query, threads)
+            return None if table is None else self._wrap_result(table)
+
+        with self._result_cache_lock:
+            key = (self._data_version, query)
+            table = self._result_cache.get(key)
+            if table is not None:
+                self._result_cache.move_to_end(key)
+
+        if table is None:
+            with self.acquire() as conn:
+                table = self._run_query(conn, query)
+            if table is None:
+                return None
+            self._cache_result(key, table)
+        return self._wrap_result(table)
+
+    def reset_session(self) -> None:
+        """
+        Discard the writer's session state and resume concurrent reads.
+
+        The writer is replaced by a fresh connection, which drops temporary
+        objects and connection-local settings and rolls back any open
+        transaction.
+        """
+        with self._write_lock:
+            previous = self._write_conn
+            self._write_conn = self._init_conn(self.connection.cursor())
+            previous.close()
+            self._session_pinned = False
+            self._in_transaction = False
+        self._invalidate_results()
+
+    def _pinned_to_writer(self) -> bool:
+        """Check whether statements must run on the writer to see its state."""
+        return self._session_pinned or self._in_transaction
+
+    def _run_on_writer(
+        self,
+        statements: Optional[List[Any]],
+        run: Callable[["duckdb.DuckDBPyConnection"], Any],
+    ) -> Any:
+        """
+        Run SQL on the writer connection under the write lock.
+
+        Args:
+            statements: Parsed statements being run, or None if unparseable
+            run: Function that runs the SQL on the writer and returns its
+                materialized result
+
+        Returns:
+            The value returned by ``run``
+        """
+        with self._write_lock:
+            succeeded = False
+            try:
+                result = run(self._write_conn)
+                succeeded = True
+            finally:
+                # Only results of single SELECTs on readers are cached; anything
+                # run on the writer may have changed the data they came from
+                self._invalidate_results()
+                self._track_session(statements or [], succeeded)
+        return result
+
+    def _track_session(self, statements: List[Any], succeeded: bool) -> None:
+        """
+        Record session state and open transactions left on the writer.
+
+        Errors are handled conservatively: a statement that may have run is
+        assumed to have taken effect, so the writer is never released early.
+        """
+        StatementType = _load_duckdb().StatementType
+        transaction_open = None
+        for statement in statements:
+            if statement.type == StatementType.SET or (
+                statement.type == StatementType.CREATE
+                and _TEMP_OBJECT_RE.match(statement.query)
+            ):
+                # Later statements may depend on the writer's session state
+                self._session_pinned = True
+            elif statement.type == StatementType.TRANSACTION:
+                transaction_open = _BEGIN_RE.match(statement.query) is not None
+                if transaction_open:
+                    self._in_transaction = True
+        if succeeded and transaction_open is not None:
+            self._in_transaction = transaction_open
+
+    def _run_query(
+        self,
+        conn: "duckdb.DuckDBPyConnection",
+        query: str,
+        threads: Optional[int] = None,
+    ) -> Optional["pa.Table"]:
+        """
+        Run a query on a connection, applying any thread override.
+
+        The result is fetched before returning, so the connection can be
+        handed to the next caller without truncating it.
+        """
+        if not threads or threads == self.threads:
+            relation = conn.sql(query)
+            return None if relation is None else relation.arrow()
+
+        with self._threads_lock:
+            conn.execute(f"PRAGMA threads={validate_threads(threads)}")
+            try:
+                relation = conn.sql(query)
+                # Materialize while the override is still in effect
+                return None if relation is None else relation.arrow()
+            finally:
+                conn.execute(f"PRAGMA threads={self.threads}")
+
+    def _wrap_result(self, table: "pa.Table") -> "duckdb.DuckDBPyRelation":
+        """
+        Wrap a materialized result in a relation the caller can fetch from.
+
+        The relation runs on a cursor private to the calling thread, so
+        fetching it never races with queries that other threads run on the
+        pooled connections.
+        """
+        cursor = getattr(self._result_cursors, "cursor", None)
+        if cursor is None:
+            cursor = self._result_cursors.cursor = self.connection.cursor()
+        return cursor.from_arrow(table)
+
+    def execute_query_arrow(
+        self, query: str, batch_size: int = 122_880
+    ) -> "pa.RecordBatchReader":
+        """
+        Execute a SQL query and stream the result as Arrow record batches.
+
+        Reads stream from a dedicated connection rather than a pooled one, since
+        running another query on a connection truncates its pending result; the
+        connection is closed once the reader is exhausted. Everything else is
+        routed to the writer like in execute_query() and returned in full.
+
         Args:
             query: SQL query to execute
+            batch_size: Rows per batch; defaults to one DuckDB row group
 
         Returns:
-            DuckDB relation result
+            Arrow record batch reader over the result
         """
-        return self.connection.sql(query)
+        self._maybe_refresh_secrets()
+        statements = _parse_statements(query)
+        if self._pinned_to_writer() or not _is_read_only(statements):
+            table = self._run_on_writer(
+                statements, lambda conn: conn.execute(query).fetch_arrow_table()
+            )
+            return table.to_reader(max_chunksize=batch_size)
+
+        cursor = self.connection.cursor()
+        try:
+            reader = cursor.execute(query).fetch_record_batch(rows_per_batch=batch_size)
+        except Exception:
+            cursor.close()
+            raise
+        return _closing_reader(reader, cursor)
+
+    def _secrets_stale(self) -> bool:
+        """Check whether 80% of the S3 credential lifetime has elapsed."""
+        return time.monotonic() - self._last_secret_refresh > 0.8 * self._secret_ttl
+
+    def _maybe_refresh_secrets(self) -> None:
+        """Re-apply S3 credentials before they are due to expire."""
+        if self._s3_args is None or self._secret_ttl <= 0 or not self._secrets_stale():
+            return
+
+        with self._secret_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not self._secrets_stale():
+                return
+            try:
+                for (name,) in self.connection.execute(
+                    "SELECT name FROM duckdb_secrets() WHERE type = 's3'"
+                ).fetchall():
+                    self.connection.execute(f'DROP SECRET "{name}"')
+            except Exception as e:
+                logger.warning("Could not drop expired S3 secrets: %s", e)
+            # Pick up credentials rotated in the environment since the last
+            # refresh; explicitly passed values are reused as they are
+            _refresh_env()
+            self.configure_s3_credentials(**self._s3_args)
 
     def configure_s3_credentials(
         self,
@@ -136,190 +654,190 @@ class DuckDBManager:
             region: S3 region
             use_ssl: Whether to use SSL for S3 connections
         """
-        # If parameters were not provided, try to get them from environment variables
-        if access_key is None:
-            access_key = (
-                os.environ.get("OPENS3_ACCESS_KEY")
-                or os.environ.get("AWS_ACCESS_KEY_ID")
-                or os.environ.get("DUCKDB_S3_ACCESS_KEY_ID")
-            )
+        # Remember the arguments so the credentials can be refreshed later
+        self._s3_args = {
+            "access_key": access_key,
+            "secret_key": secret_key,
+            "endpoint": endpoint,
+            "region": region,
+            "use_ssl": use_ssl,
+        }
+        self._last_secret_refresh = time.monotonic()
 
-        if secret_key is None:
-            secret_key = (
-                os.environ.get("OPENS3_SECRET_KEY")
-                or os.environ.get("AWS_SECRET_ACCESS_KEY")
-                or os.environ.get("DUCKDB_S3_SECRET_ACCESS_KEY")
-            )
+        # If parameters were not provided, try to get them from environment variables
+        access_key = access_key or _first_env(
+            "OPENS3_ACCESS_KEY", "AWS_ACCESS_KEY_ID", "DUCKDB_S3_ACCESS_KEY_ID"
+        )
+        secret_key = secret_key or _first_env(
+            "OPENS3_SECRET_KEY", "AWS_SECRET_ACCESS_KEY", "DUCKDB_S3_SECRET_ACCESS_KEY"
+        )
 
         if endpoint is None:
-            endpoint = (
-                os.environ.get("OPENS3_ENDPOINT")
-                or os.environ.get("S3_ENDPOINT")
-                or os.environ.get("DUCKDB_S3_ENDPOINT")
+            endpoint = _first_env(
+                "OPENS3_ENDPOINT", "S3_ENDPOINT", "DUCKDB_S3_ENDPOINT"
             )
             # Add protocol if missing
-            if endpoint and not (
-                endpoint.startswith("http://") or endpoint.startswith("https://")
-            ):
+            if endpoint and not _SCHEME_RE.match(endpoint):
                 endpoint = f"http://{endpoint}"
 
-        if region is None:
-            region = (
-                os.environ.get("AWS_REGION")
-                or os.environ.get("AWS_DEFAULT_REGION")
-                or "us-east-1"
-            )
+        region = region or _first_env("AWS_REGION", "AWS_DEFAULT_REGION") or "us-east-1"
+        try:
+            region = validate_region(region)
+        except ValueError as e:
+            # The region ends up in a SQL literal, so an unusual value is not
+            # passed through, but it must not stop the server from starting
+            logger.warning("%s; using us-east-1 instead", e)
+            region = "us-east-1"
+
+        if use_ssl is True:
+            raw_use_ssl = _first_env("DUCKDB_S3_USE_SSL", "S3_USE_SSL")
+            if raw_use_ssl:
+                use_ssl = raw_use_ssl.lower() in ("true", "1", "yes")
+
+        logger.debug(
+            "S3 config: access_key=%s secret_key=%s endpoint=%s region=%s use_ssl=%s",
+            "***" if access_key else None,
+            "***" if secret_key else None,
+            endpoint,
+            region,
+            use_ssl,
+        )
 
-        if use_ssl is True and os.environ.get("DUCKDB_S3_USE_SSL") is not None:
-            use_ssl = os.environ.get("DUCKDB_S3_USE_SSL").lower() in (
-                "true",
-                "1",
-                "yes",
-            )
-        elif use_ssl is True and os.environ.get("S3_USE_SSL") is not None:
-            use_ssl = os.environ.get("S3_USE_SSL").lower() in ("true", "1", "yes")
+        # Handle OpenS3-specific configurations
+        is_opens3 = bool(endpoint and _LOCAL_ENDPOINT_RE.search(endpoint))
 
-        print(f"S3 configuration from environment:")
-        print(f"  access_key: {'***' if access_key else 'None'}")
-        print(f"  secret_key: {'***' if secret_key else 'None'}")
-        print(f"  endpoint: {endpoint or 'None'}")
-        print(f"  region: {region or 'None'}")
-        print(f"  use_ssl: {use_ssl}")
+        # Secret options shared by explicit keys and the credential chain
+        options: Dict[str, Union[str, bool]] = {"REGION": region, "USE_SSL": use_ssl}
 
-        # Handle OpenS3-specific configurations
-        is_opens3 = endpoint and (
-            "10.0.0.204" in endpoint
-            or "localhost" in endpoint
-            or "127.0.0.1" in endpoint
-        )
+        # Fix for protocol dropping issue with DuckDB's httpfs
+        if is_opens3:
+            # Remove protocol and trailing slash for better DuckDB compatibility
+            endpoint_no_protocol = _SCHEME_RE.sub("", endpoint).rstrip("/")
+            logger.debug(
+                "Using OpenS3 endpoint (no protocol): %s", endpoint_no_protocol
+            )
+
+            # Use the endpoint without protocol to avoid DuckDB's double-slash issue
+            options["ENDPOINT"] = endpoint_no_protocol
+            # Set path style URL access which is required for OpenS3
+            options["URL_STYLE"] = "path"
+            # Disable SSL for local testing if using http protocol
+            if endpoint.startswith("http://"):
+                options["USE_SSL"] = False
+        elif endpoint:
+            # Standard AWS S3 configuration
+            options["ENDPOINT"] = endpoint
 
         if access_key and secret_key:
-            # Set global variables for httpfs
-            try:
-                # Fix for protocol dropping issue with DuckDB's httpfs
-                if is_opens3 and endpoint:
-                    # Remove protocol and trailing slash for better DuckDB compatibility
-                    endpoint_no_protocol = (
-                        endpoint.replace("http://", "")
-                        .replace("https://", "")
-                        .rstrip("/")
-                    )
-                    print(
-                        f"Using OpenS3 endpoint (no protocol): {endpoint_no_protocol}"
-                    )
-
-                    # Try both URL styles for OpenS3 compatibility
-                    # First try virtual host style (default)
-                    self.connection.sql("SET s3_url_style='vhost';")
-                    print(f"✅ Configured for OpenS3 virtual-host URL access")
-
-                    # Use the endpoint without protocol to avoid DuckDB's double-slash issue
-                    self.connection.sql(f"SET s3_access_key_id='{access_key}';")
-                    self.connection.sql(f"SET s3_secret_access_key='{secret_key}';")
-                    self.connection.sql(f"SET s3_endpoint='{endpoint_no_protocol}';")
-                    # Set path style URL access which is required for OpenS3
-                    self.connection.sql("SET s3_url_style='path';")
-                    # Disable SSL for local testing if using http protocol
-                    if endpoint.startswith("http://"):
-                        self.connection.sql("SET s3_use_ssl=false;")
-                    print(f"✅ Configured OpenS3 server at {endpoint_no_protocol}")
-                else:
-                    # Standard AWS S3 configuration
-                    self.connection.sql(f"SET s3_access_key_id='{access_key}';")
-                    self.connection.sql(f"SET s3_secret_access_key='{secret_key}';")
-
-                    if endpoint:
-                        self.connection.sql(f"SET s3_endpoint='{endpoint}';")
-
-                self.connection.sql(f"SET s3_region='{region}';")
-                self.connection.sql(f"SET s3_use_ssl={str(use_ssl).lower()};")
-
-                # Do a quick test query to verify connection
-                try:
-                    # We'll query for the S3 configuration which should be accessible with these credentials
-                    self.connection.sql("SELECT s3_config_values LIMIT 1;")
-                    print(f"✅ Successfully configured S3 credentials for DuckDB")
-
-                    # If it's OpenS3, try a more specific check
-                    if is_opens3:
-                        try:
-                            # Try to access a known bucket in OpenS3 for verification
-                            self.connection.sql(
-                                "SET s3_allow_errors=true;"
-                            )  # Allow errors to continue execution
-
-                            # Test if we can find any available buckets
-                            buckets = ["my-test-bucket", "test-bucket-2", "my-bucket"]
-                            for bucket in buckets:
-                                try:
-                                    # Look for files in a common bucket
-                                    print(f"Testing connection to bucket '{bucket}'...")
-                                    self.connection.sql(
-                                        f"SELECT * FROM read_csv_auto('s3://{bucket}/*') LIMIT 0;"
-                                    )
-                                    print(
-                                        f"✅ Successfully verified connection to '{bucket}' bucket in OpenS3"
-                                    )
-                                    break
-                                except Exception:
-                                    continue
-
-                        except Exception as opens3_error:
-                            print(
-                                f"ℹ️ OpenS3 verification attempted but couldn't locate buckets: {opens3_error}"
-                            )
-                            print("   Make sure you have files in your OpenS3 buckets.")
-                except Exception as test_error:
-                    print(
-                        f"⚠️ S3 credentials set but verification query failed: {test_error}"
-                    )
-                    print("   This might affect your ability to query S3 data.")
+            provider = "CONFIG"
+            options["KEY_ID"] = access_key
+            options["SECRET"] = secret_key
+        else:
+            # Fall back to the AWS credential chain (environment, STS, instance)
+            provider = "CREDENTIAL_CHAIN"
+            options["CHAIN"] = "env;sts;instance"
+
+        # A secret applies to every connection on the database. CREATE SECRET
+        # does not accept bound parameters, so values are escaped literals; the
+        # secret is kept in memory only so keys are never written to disk
+        sql = "CREATE OR REPLACE SECRET oa_s3 (TYPE S3, PROVIDER {}, {})".format(
+            provider,
+            ", ".join(
+                f"{name} {_sql_literal(value)}" for name, value in options.items()
+            ),
+        )
 
-            except Exception as e:
-                print(f"❌ Error configuring S3 credentials: {e}")
-                print(
-                    "   Without S3 credentials, OpenAthena cannot connect to OpenS3 buckets."
+        try:
+            self.connection.execute(sql)
+            logger.info("Configured S3 credentials for DuckDB (%s)", endpoint)
+        except Exception as e:
+            if access_key and secret_key:
+                logger.error(
+                    "Error configuring S3 credentials: %s. Without S3 credentials, "
+                    "OpenAthena cannot connect to OpenS3 buckets.",
+                    e,
                 )
-                print("   Please check your environment variables.")
-        else:
-            print("⚠️ S3 credentials not found in environment variables.")
-            print(
-                "   To connect to OpenS3, set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY"
-            )
-            print(
-                "   or OPENS3_ACCESS_KEY and OPENS3_SECRET_KEY environment variables."
+                return
+
+            logger.debug("Credential chain unavailable: %s", e)
+            logger.warning(
+                "S3 credentials not found. Set OPENS3_ACCESS_KEY and "
+                "OPENS3_SECRET_KEY (or AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY), "
+                "e.g. by running 'configure-opens3'."
             )
-            if not os.environ.get("AWS_ACCESS_KEY_ID") and not os.environ.get(
-                "OPENS3_ACCESS_KEY"
-            ):
-                print("❌ Warning: No S3 credentials found in environment variables.")
-                print("   OpenAthena will not be able to connect to OpenS3.")
-                print(
-                    "   Please set credentials in your .env file or environment variables."
-                )
-                print(
-                    "   Hint: Run 'python -m open_athena.main configure_opens3' to set up credentials."
+            if not _first_env("S3_ENDPOINT", "OPENS3_ENDPOINT"):
+                logger.warning(
+                    "No S3 endpoint configured; using the default AWS S3 endpoint. "
+                    "Set S3_ENDPOINT or OPENS3_ENDPOINT to connect to OpenS3."
                 )
 
-            # Check endpoint configuration
-            if os.environ.get("S3_ENDPOINT") or os.environ.get("OPENS3_ENDPOINT"):
-                detected_endpoint = os.environ.get("S3_ENDPOINT") or os.environ.get(
-                    "OPENS3_ENDPOINT"
-                )
-                print(f"   Using S3 endpoint from environment: {detected_endpoint}")
-            else:
-                print(
-                    "⚠️ No S3 endpoint found in environment variables. Using default AWS S3 endpoint."
-                )
-                print(
-                    "   If you're connecting to OpenS3, this will fail. Set S3_ENDPOINT or OPENS3_ENDPOINT."
-                )
-                print(
-                    "   Hint: For your Raspberry Pi OpenS3 server, use: http://10.0.0.204:80"
-                )
+    def list_tables(self) -> List[str]:
+        """
+        List the tables and views registered in the database.
+
+        Returns:
+            Table and view names
+        """
+        with self.acquire() as conn:
+            rows = conn.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' ORDER BY table_name"
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def warm_cache(self, urls: Iterable[str]) -> int:
+        """
+        Pre-read remote files so their metadata is cached for later queries.
+
+        Each file is scanned with ``LIMIT 0``, which fetches the Parquet footer
+        (or CSV/JSON header sample) into DuckDB's object and HTTP metadata
+        caches without reading the data itself.
+
+        Args:
+            urls: File URLs (s3://, http(s):// or local paths) to warm
+
+        Returns:
+            Number of files that were warmed successfully
+        """
+        warmed = 0
+        with self.acquire() as conn:
+            for url in urls:
+                suffix = url.rsplit(".", 1)[-1].lower()
+                reader = _WARM_READERS.get(suffix, "read_parquet")
+                try:
+                    conn.execute(f"SELECT * FROM {reader}(?) LIMIT 0", [url]).fetchall()
+                    warmed += 1
+                except Exception as e:
+                    logger.warning("Could not warm cache for %s: %s", url, e)
+        return warmed
+
+    def verify_s3(self, bucket: str) -> bool:
+        """
+        Check that a bucket is reachable with the configured S3 credentials.
+
+        This performs real network I/O, so it is only run on demand (for example
+        from the health endpoint) rather than during startup.
+
+        Args:
+            bucket: Name of the bucket to list
+
+        Returns:
+            True if the bucket could be listed, False otherwise
+        """
+        try:
+            self.connection.execute(
+                "SELECT * FROM glob(?) LIMIT 1", [f"s3://{bucket}/*"]
+            ).fetchall()
+            return True
+        except Exception as e:
+            logger.warning("Could not reach S3 bucket '%s': %s", bucket, e)
+            return False
 
     def close(self) -> None:
         """Close the DuckDB connection."""
+        while not self._read_pool.empty():
+            self._read_pool.get_nowait().close()
+        self._write_conn.close()
         if self.connection is not None:
             self.connection.close()
             self.connection = None
@@ -5,19 +5,37 @@ This module provides the main entry point for running OpenAthena as a standalone
 """
 
 import argparse
-import getpass
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict
-
-from open_athena import __version__
-from open_athena.api import app, get_db
-from open_athena.config import get_config
+from typing import Any, Dict, List, Optional
 
+from dotenv import load_dotenv
 
-def parse_args():
-    """Parse command line arguments."""
+from open_athena import __version__
+from open_athena.validators import validate_port
+
+# The server and configuration modules (and DuckDB with them) are imported
+# inside the functions that need them, so ``--version`` stays fast. The .env
+# file is still loaded up front because it feeds the argument defaults.
+load_dotenv()
+
+# Environment-derived defaults, resolved once since they do not change after
+# the process starts. The port stays a string: argparse runs string defaults
+# through the option's type, so a bad value is reported as a usage error
+# rather than failing the import
+_DEFAULTS: Dict[str, Any] = {
+    "config": os.environ.get("OPENATHENA_CONFIG_PATH"),
+    "catalog": os.environ.get("OPENATHENA_CATALOG_PATH", "catalog.yml"),
+    "port": os.environ.get("OPENATHENA_PORT", "8000"),
+    "host": os.environ.get("OPENATHENA_HOST", "0.0.0.0"),
+    "metadata_cache": os.environ.get("OPENATHENA_METADATA_CACHE", ".oa_cache"),
+    "warm_cache": os.environ.get("OPENATHENA_WARM_CACHE"),
+}
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
     parser = argparse.ArgumentParser(
         description="OpenAthena - SQL analytics engine for OpenS3 powered by DuckDB"
     )
@@ -25,31 +43,60 @@ def parse_args():
     parser.add_argument(
         "--config",
         help="Path to configuration file",
-        default=os.environ.get("OPENATHENA_CONFIG_PATH"),
+        default=_DEFAULTS["config"],
     )
 
     parser.add_argument(
         "--catalog",
         help="Path to catalog file",
-        default=os.environ.get("OPENATHENA_CATALOG_PATH", "catalog.yml"),
+        default=_DEFAULTS["catalog"],
     )
 
     parser.add_argument(
         "--port",
-        type=int,
+        type=validate_port,
         help="API server port",
-        default=int(os.environ.get("OPENATHENA_PORT", "8000")),
+        default=_DEFAULTS["port"],
     )
 
     parser.add_argument(
         "--host",
         help="API server host",
-        default=os.environ.get("OPENATHENA_HOST", "0.0.0.0"),
+        default=_DEFAULTS["host"],
+    )
+
+    parser.add_argument(
+        "--metadata-cache",
+        help="Directory for DuckDB's spilled and cached data",
+        default=_DEFAULTS["metadata_cache"],
+    )
+
+    parser.add_argument(
+        "--warm-cache",
+        help="Comma-separated file URLs to pre-read into DuckDB's caches at startup",
+        default=_DEFAULTS["warm_cache"],
     )
 
     parser.add_argument("--version", action="store_true", help="Show version and exit")
 
-    return parser.parse_args()
+    return parser
+
+
+# Built once at import so repeated parsing (tests, embedded use) reuses it
+_PARSER = _build_parser()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Arguments to parse; defaults to ``sys.argv[1:]``
+
+    Returns:
+        Parsed arguments
+    """
+    return _PARSER.parse_args(argv)
 
 
 def main():
@@ -60,6 +107,9 @@ def main():
         print(f"OpenAthena v{__version__}")
         sys.exit(0)
 
+    from open_athena.api import app, get_db
+    from open_athena.config import get_config
+
     # Load configuration
     config = get_config(args.config)
 
@@ -74,6 +124,22 @@ def main():
     if args.port:
         os.environ["OPENATHENA_PORT"] = str(args.port)
 
+    if args.metadata_cache:
+        os.environ["OPENATHENA_METADATA_CACHE"] = args.metadata_cache
+
+    if args.warm_cache:
+        os.environ["OPENATHENA_WARM_CACHE"] = args.warm_cache
+
+    # Initialize the database before serving so the first request does not
+    # pay for extension loading, catalog registration and metadata fetches
+    try:
+        db = get_db()
+        for table in db.list_tables():
+            quoted = table.replace('"', '""')
+            db.execute_query(f'SELECT * FROM "{quoted}" LIMIT 0').fetchall()
+    except Exception as e:
+        print(f"Warning: Could not pre-warm the database: {e}")
+
     # Start the API server
     import uvicorn
 
@@ -89,6 +155,8 @@ def configure_opens3():
     Interactive configuration of OpenS3 connection settings.
     Creates a .env file with appropriate environment variables.
     """
+    import getpass
+
     print("\n" + "=" * 50)
     print("OpenAthena - OpenS3 Connection Configuration")
     print("=" * 50)
@@ -125,27 +193,40 @@ def configure_opens3():
     if create_env == "y":
         env_path = Path(".env")
 
-        # Create or overwrite the .env file
-        with open(env_path, "w") as env_file:
-            env_file.write(f"# OpenAthena Environment Configuration\n")
-            env_file.write(f"# Created by OpenAthena setup.py\n\n")
-
+        lines = [
+            "# OpenAthena Environment Configuration",
+            "# Created by OpenAthena setup.py",
+            "",
             # OpenS3 connection settings
-            env_file.write(f"# OpenS3 Connection Settings\n")
-            env_file.write(f"OPENS3_ENDPOINT={endpoint}\n")
-            if access_key:
-                env_file.write(f"OPENS3_ACCESS_KEY={access_key}\n")
-            if secret_key:
-                env_file.write(f"OPENS3_SECRET_KEY={secret_key}\n")
-
-            # Additional optional settings with comments
-            env_file.write(f"\n# Optional OpenAthena Settings\n")
-            env_file.write(f"# OPENATHENA_CATALOG_PATH=catalog.yml\n")
-            env_file.write(f"# OPENATHENA_DB_PATH=openathena.db\n")
-            env_file.write(f"# OPENATHENA_HOST=0.0.0.0\n")
-            env_file.write(f"# OPENATHENA_PORT=8000\n")
-            env_file.write(f"# OPENATHENA_THREADS=4\n")
-            env_file.write(f"# OPENATHENA_MEMORY_LIMIT=4GB\n")
+            "# OpenS3 Connection Settings",
+            f"OPENS3_ENDPOINT={endpoint}",
+        ]
+        if access_key:
+            lines.append(f"OPENS3_ACCESS_KEY={access_key}")
+        if secret_key:
+            lines.append(f"OPENS3_SECRET_KEY={secret_key}")
+
+        # Additional optional settings with comments
+        lines += [
+            "",
+            "# Optional OpenAthena Settings",
+            "# OPENATHENA_CATALOG_PATH=catalog.yml",
+            "# OPENATHENA_DB_PATH=openathena.db",
+            "# OPENATHENA_HOST=0.0.0.0",
+            "# OPENATHENA_PORT=8000",
+            "# OPENATHENA_THREADS=4",
+            "# OPENATHENA_MEMORY_LIMIT=4GB",
+        ]
+
+        # Create or overwrite the .env file in a single write. It holds
+        # credentials, so it is created readable only by the owner rather than
+        # restricted after the secrets are already on disk
+        fd = os.open(env_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        if hasattr(os, "fchmod"):
+            # The mode above only applies to new files; tighten an existing one
+            os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
 
         print(f"\n✅ .env file created successfully at: {env_path.absolute()}")
         print("You can edit this file later to update your configuration.")
@@ -7,14 +7,89 @@ with OpenS3 using HTTP headers instead of embedded credentials in URLs.
 """
 
 import base64
+import functools
+import logging
 import os
-from typing import Optional
+import re
+import weakref
+from typing import TYPE_CHECKING, Optional, Tuple
 
-import duckdb
+# DuckDB is only needed for type hints; callers that just resolve credentials
+# do not pay for loading it
+if TYPE_CHECKING:
+    import duckdb
+
+logger = logging.getLogger(__name__)
+
+_SCHEME_RE = re.compile(r"^https?://")
+
+# httpfs only needs installing once per process; it is cached on disk after that
+_HTTPFS_INSTALLED = False
+
+# Whether the community cache_httpfs extension could be installed; None until
+# the first attempt, which is made once per process
+_CACHE_HTTPFS_INSTALLED: Optional[bool] = None
+
+# Where cache_httpfs keeps remote blocks between queries and processes
+_HTTPFS_CACHE_DIR = os.environ.get("OPENATHENA_HTTPFS_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "openathena", "httpfs"
+)
+
+# Credentials each connection was last configured with, so repeated calls
+# with the same settings are skipped
+_CONFIGURED: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+@functools.lru_cache(maxsize=32)
+def _normalize_endpoint(endpoint: str) -> Tuple[str, str]:
+    """
+    Normalize an OpenS3 endpoint.
+
+    Args:
+        endpoint: Endpoint with or without a protocol (e.g., localhost:8001)
+
+    Returns:
+        Tuple of (endpoint with protocol, host and port only), both without
+        trailing slashes
+    """
+    endpoint = endpoint.rstrip("/")
+    # One scan both detects and strips the protocol
+    bare, has_scheme = _SCHEME_RE.subn("", endpoint, count=1)
+    return (endpoint if has_scheme else f"http://{endpoint}"), bare
+
+
+def _enable_httpfs_cache(connection: "duckdb.DuckDBPyConnection") -> None:
+    """
+    Cache remote reads on local disk when the cache_httpfs extension is available.
+
+    Repeated scans of the same objects then read Parquet footers and column
+    chunks from disk instead of fetching them from OpenS3 again.
+
+    Args:
+        connection: DuckDB connection with httpfs loaded
+    """
+    global _CACHE_HTTPFS_INSTALLED
+    if _CACHE_HTTPFS_INSTALLED is False:
+        return
+
+    try:
+        if _CACHE_HTTPFS_INSTALLED is None:
+            connection.execute("INSTALL cache_httpfs FROM community")
+            _CACHE_HTTPFS_INSTALLED = True
+        connection.execute(
+            "LOAD cache_httpfs;"
+            "SET cache_httpfs_type='on_disk';"
+            "SET cache_httpfs_cache_directory=?;",
+            [_HTTPFS_CACHE_DIR],
+        )
+    except Exception as e:
+        # The cache is optional; reads go straight to OpenS3 without it
+        _CACHE_HTTPFS_INSTALLED = False
+        logger.debug("cache_httpfs not available: %s", e)
 
 
 def configure_httpfs_headers_auth(
-    connection: duckdb.DuckDBPyConnection, username: str, password: str, endpoint: str
+    connection: "duckdb.DuckDBPyConnection", username: str, password: str, endpoint: str
 ) -> None:
     """
     Configure DuckDB's httpfs extension to authenticate with OpenS3.
@@ -27,78 +102,116 @@ def configure_httpfs_headers_auth(
         password: OpenS3 password
         endpoint: OpenS3 endpoint URL (e.g., localhost:8001)
     """
-    # Format endpoint without protocol
-    if endpoint.startswith("http://"):
-        endpoint_with_protocol = endpoint
-        endpoint = endpoint[7:]
-    elif endpoint.startswith("https://"):
-        endpoint_with_protocol = endpoint
-        endpoint = endpoint[8:]
-    else:
-        endpoint_with_protocol = f"http://{endpoint}"
-
-    # Remove trailing slashes
-    endpoint = endpoint.rstrip("/")
+    endpoint_with_protocol, endpoint = _normalize_endpoint(endpoint)
+
+    # Nothing to do if this connection already uses these settings
+    settings = (username, password, endpoint)
+    if _CONFIGURED.get(connection) == settings:
+        return
 
+    global _HTTPFS_INSTALLED
     try:
-        # Make sure httpfs is loaded
-        connection.sql("INSTALL httpfs; LOAD httpfs;")
+        # Make sure httpfs is installed (once per process) and loaded
+        if not _HTTPFS_INSTALLED:
+            connection.execute("INSTALL httpfs")
+            _HTTPFS_INSTALLED = True
+
+        # Fixed settings are sent as one script
+        connection.execute(
+            "LOAD httpfs;"
+            "SET s3_url_style='path';"  # Required for OpenS3
+            "SET s3_use_ssl=false;"  # For local testing
+            # Reuse connections and retry transient failures instead of
+            # opening new connections for every request
+            "SET http_keep_alive=true;"
+            "SET http_retries=3;"
+            "SET http_timeout=30;"
+            # Keep Parquet footers in memory so repeated scans do not re-issue
+            # the small range requests that read them
+            "SET parquet_metadata_cache=true;"
+        )
+        _enable_httpfs_cache(connection)
 
         # Configure the S3 credentials (using the same credentials for HTTP Basic Auth)
-        # This is our best alternative since we can't set HTTP headers directly
-        connection.sql(f"SET s3_access_key_id='{username}';")
-        connection.sql(f"SET s3_secret_access_key='{password}';")
-        connection.sql(f"SET s3_endpoint='http://{endpoint}';")
-        connection.sql("SET s3_url_style='path';")  # Required for OpenS3
-        connection.sql("SET s3_use_ssl=false;")  # For local testing
+        # This is our best alternative since we can't set HTTP headers directly.
+        # Values are bound as parameters so they are never parsed as SQL; DuckDB
+        # only binds the last statement of a script, hence one call per setting
+        for name, value in (
+            ("s3_access_key_id", username),
+            ("s3_secret_access_key", password),
+            ("s3_endpoint", f"http://{endpoint}"),
+        ):
+            connection.execute(f"SET {name}=?", [value])
+        _CONFIGURED[connection] = settings
 
         # Set only OpenS3-related environment variables in this process
         os.environ["OPENS3_ACCESS_KEY"] = username
         os.environ["OPENS3_SECRET_KEY"] = password
         os.environ["OPENS3_ENDPOINT"] = endpoint_with_protocol
         os.environ["S3_ENDPOINT"] = endpoint_with_protocol
+        invalidate_opens3_credentials()
 
-        print(f"✅ Configured S3 credentials for OpenS3 at {endpoint}")
-        print(
-            f"✅ Environment variables set: OPENS3_ACCESS_KEY={username}, OPENS3_ENDPOINT={endpoint_with_protocol}"
+        logger.info("Configured S3 credentials for OpenS3 at %s", endpoint)
+        logger.debug(
+            "Environment variables set: OPENS3_ACCESS_KEY=%s, OPENS3_ENDPOINT=%s",
+            username,
+            endpoint_with_protocol,
         )
 
         # Verify httpfs extension is properly loaded
         try:
             connection.sql("SELECT httpfs_version() as version")
-        except:
-            print("⚠️ httpfs_version() not available in this DuckDB version")
+        except Exception:
+            logger.debug("httpfs_version() not available in this DuckDB version")
 
     except Exception as e:
-        print(f"❌ Error configuring S3 authentication: {e}")
-        print("   Authentication with OpenS3 may fail.")
+        logger.error(
+            "Error configuring S3 authentication: %s. "
+            "Authentication with OpenS3 may fail.",
+            e,
+        )
+
 
+@functools.lru_cache(maxsize=8)
+def _mask_password(password: str) -> str:
+    """Mask all but the first and last two characters of a password."""
+    if len(password) <= 4:
+        return "****"
+    return password[:2] + "*" * (len(password) - 4) + password[-2:]
 
-def get_opens3_credentials():
+
+def get_opens3_credentials() -> Tuple[str, str, str]:
     """Get OpenS3 endpoint and credentials from environment variables.
 
+    The environment is read on the first call only; later calls return the
+    same values until invalidate_opens3_credentials() is called.
+
     Returns:
         Tuple of (endpoint, username, password)
     """
+    return _resolve_opens3_credentials()
+
+
+def invalidate_opens3_credentials() -> None:
+    """Re-read the environment on the next get_opens3_credentials() call."""
+    _resolve_opens3_credentials.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_opens3_credentials() -> Tuple[str, str, str]:
+    """Resolve OpenS3 endpoint and credentials from environment variables."""
     # Try to get endpoint from environment variables
     endpoint = os.environ.get("OPENS3_ENDPOINT") or os.environ.get("S3_ENDPOINT")
 
-    # Print debug information about the environment
-    print(f"Debug: OPENS3_ENDPOINT = {os.environ.get('OPENS3_ENDPOINT')}")
-    print(f"Debug: S3_ENDPOINT = {os.environ.get('S3_ENDPOINT')}")
-    print(
-        f"Debug: OPENS3_ACCESS_KEY = {'Set' if os.environ.get('OPENS3_ACCESS_KEY') else 'Not set'}"
-    )
-    print(
-        f"Debug: OPENS3_SECRET_KEY = {'Set' if os.environ.get('OPENS3_SECRET_KEY') else 'Not set'}"
+    # Log debug information about the environment
+    logger.debug(
+        "OPENS3_ENDPOINT=%s S3_ENDPOINT=%s OPENS3_ACCESS_KEY=%s OPENS3_SECRET_KEY=%s",
+        os.environ.get("OPENS3_ENDPOINT"),
+        os.environ.get("S3_ENDPOINT"),
+        "Set" if os.environ.get("OPENS3_ACCESS_KEY") else "Not set",
+        "Set" if os.environ.get("OPENS3_SECRET_KEY") else "Not set",
     )
 
-    # Ensure endpoint has a protocol
-    if endpoint and not (
-        endpoint.startswith("http://") or endpoint.startswith("https://")
-    ):
-        endpoint = f"http://{endpoint}"
-
     # Get credentials from environment variables - focus on OpenS3 variables
     # For username/access_key - prioritize OpenS3-specific variables
     username = (
@@ -118,12 +231,12 @@ def get_opens3_credentials():
     )
 
     # Log credentials being used (without revealing full password)
-    masked_password = (
-        password[:2] + "*" * (len(password) - 4) + password[-2:]
-        if len(password) > 4
-        else "****"
-    )
-    print(f"Using credentials: username={username}, password={masked_password}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Using credentials: username=%s, password=%s",
+            username,
+            _mask_password(password),
+        )
 
     # Default values for local testing
     if not endpoint:
@@ -133,12 +246,8 @@ def get_opens3_credentials():
     if not password:
         password = "password"
 
-    # Format endpoint with protocol if missing
-    if not (endpoint.startswith("http://") or endpoint.startswith("https://")):
-        endpoint = f"http://{endpoint}"
-
-    # Strip trailing slashes
-    endpoint = endpoint.rstrip("/")
+    # Add the protocol if missing and strip trailing slashes
+    endpoint = _normalize_endpoint(endpoint)[0]
 
     # Always set environment variables here to ensure they're accessible
     # across the entire process - only use OpenS3-specific variables
@@ -147,8 +256,11 @@ def get_opens3_credentials():
     os.environ["S3_ENDPOINT"] = endpoint
     os.environ["OPENS3_ENDPOINT"] = endpoint
 
-    print(f"✅ Environment variables set/refreshed for OpenS3 access:")
-    print(f"   Endpoint: {endpoint}")
-    print(f"   Username: {username}")
+    logger.debug(
+        "Environment variables set/refreshed for OpenS3 access: "
+        "endpoint=%s username=%s",
+        endpoint,
+        username,
+    )
 
     return endpoint, username, password
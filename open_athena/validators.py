@@ -0,0 +1,107 @@
+"""
+Validators for OpenAthena configuration values.
+
+These checks run before values are used in DuckDB settings, so malformed
+input fails early with a clear message instead of producing invalid SQL.
+"""
+
+import re
+from typing import Union
+
+_MEMORY_LIMIT_RE = re.compile(r"^\d+(?:\.\d+)?\s*(?:[KMGT]i?B|%)?$", re.IGNORECASE)
+# AWS regions (us-east-1) as well as custom names used by S3-compatible servers
+_REGION_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+
+def validate_memory_limit(value: str) -> str:
+    """
+    Validate a DuckDB memory limit such as ``4GB`` or ``512MiB``.
+
+    Args:
+        value: Memory limit to validate
+
+    Returns:
+        The memory limit with surrounding whitespace removed
+
+    Raises:
+        ValueError: If the value is not a size or percentage
+    """
+    value = str(value).strip()
+    if not _MEMORY_LIMIT_RE.match(value):
+        raise ValueError(f"Invalid memory limit: {value!r}")
+    return value
+
+
+def validate_region(value: str) -> str:
+    """
+    Validate an S3 region name such as ``us-east-1``.
+
+    Args:
+        value: Region to validate
+
+    Returns:
+        The region name
+
+    Raises:
+        ValueError: If the region contains unexpected characters
+    """
+    if not _REGION_RE.match(value):
+        raise ValueError(f"Invalid S3 region: {value!r}")
+    return value
+
+
+def validate_threads(value: Union[int, str]) -> int:
+    """
+    Validate a thread count.
+
+    Args:
+        value: Thread count to validate
+
+    Returns:
+        The thread count as an integer
+
+    Raises:
+        ValueError: If the value is not a positive integer
+    """
+    threads = int(value)
+    if threads < 1:
+        raise ValueError(f"Thread count must be positive: {value!r}")
+    return threads
+
+
+def validate_port(value: Union[int, str]) -> int:
+    """
+    Validate a TCP port number.
+
+    Args:
+        value: Port to validate
+
+    Returns:
+        The port as an integer
+
+    Raises:
+        ValueError: If the value is not between 1 and 65535
+    """
+    port = int(value)
+    if not 1 <= port <= 65535:
+        raise ValueError(f"Port must be between 1 and 65535: {value!r}")
+    return port
+
+
+def validate_row_limit(value: Union[int, str]) -> int:
+    """
+    Validate a row limit, where 0 means no limit.
+
+    Args:
+        value: Row limit to validate
+
+    Returns:
+        The row limit as an integer
+
+    Raises:
+        ValueError: If the value is negative
+    """
+    limit = int(value)
+    if limit < 0:
+        raise ValueError(f"Row limit must not be negative: {value!r}")
+    return limit
@@ -16,6 +16,10 @@ def configure_opens3():
     """
     Interactive configuration of OpenS3 connection settings
     Creates a .env file with appropriate environment variables
+
+    This mirrors open_athena.main.configure_opens3 but imports nothing from the
+    package, since it runs during installation, before the package's
+    dependencies can be relied on.
     """
     print("\n" + "=" * 50)
     print("OpenAthena - OpenS3 Connection Configuration")
@@ -53,27 +57,40 @@ def configure_opens3():
     if create_env == "y":
         env_path = Path(".env")
 
-        # Create or overwrite the .env file
-        with open(env_path, "w") as env_file:
-            env_file.write(f"# OpenAthena Environment Configuration\n")
-            env_file.write(f"# Created by OpenAthena setup.py\n\n")
-
+        lines = [
+            "# OpenAthena Environment Configuration",
+            "# Created by OpenAthena setup.py",
+            "",
             # OpenS3 connection settings
-            env_file.write(f"# OpenS3 Connection Settings\n")
-            env_file.write(f"OPENS3_ENDPOINT={endpoint}\n")
-            if access_key:
-                env_file.write(f"OPENS3_ACCESS_KEY={access_key}\n")
-            if secret_key:
-                env_file.write(f"OPENS3_SECRET_KEY={secret_key}\n")
-
-            # Additional optional settings with comments
-            env_file.write(f"\n# Optional OpenAthena Settings\n")
-            env_file.write(f"# OPENATHENA_CATALOG_PATH=catalog.yml\n")
-            env_file.write(f"# OPENATHENA_DB_PATH=openathena.db\n")
-            env_file.write(f"# OPENATHENA_HOST=0.0.0.0\n")
-            env_file.write(f"# OPENATHENA_PORT=8000\n")
-            env_file.write(f"# OPENATHENA_THREADS=4\n")
-            env_file.write(f"# OPENATHENA_MEMORY_LIMIT=4GB\n")
+            "# OpenS3 Connection Settings",
+            f"OPENS3_ENDPOINT={endpoint}",
+        ]
+        if access_key:
+            lines.append(f"OPENS3_ACCESS_KEY={access_key}")
+        if secret_key:
+            lines.append(f"OPENS3_SECRET_KEY={secret_key}")
+
+        # Additional optional settings with comments
+        lines += [
+            "",
+            "# Optional OpenAthena Settings",
+            "# OPENATHENA_CATALOG_PATH=catalog.yml",
+            "# OPENATHENA_DB_PATH=openathena.db",
+            "# OPENATHENA_HOST=0.0.0.0",
+            "# OPENATHENA_PORT=8000",
+            "# OPENATHENA_THREADS=4",
+            "# OPENATHENA_MEMORY_LIMIT=4GB",
+        ]
+
+        # Create or overwrite the .env file in a single write. It holds
+        # credentials, so it is created readable only by the owner rather than
+        # restricted after the secrets are already on disk
+        fd = os.open(env_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        if hasattr(os, "fchmod"):
+            # The mode above only applies to new files; tighten an existing one
+            os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
 
         print(f"\n✅ .env file created successfully at: {env_path.absolute()}")
         print("You can edit this file later to update your configuration.")
@@ -180,6 +197,13 @@ setup(
         "requests>=2.31.0",
         "python-dotenv>=1.0.0",
     ],
+    extras_require={
+        # Optional accelerators, picked up automatically when installed
+        "fast": [
+            "orjson>=3.9.0",
+            "tabulate>=0.9.0",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "open-athena=open_athena.main:main",
@@ -1,59 +1,106 @@
 import os
 import sys
+from typing import List, Optional
 
 import duckdb
 
-print("🦆 Setting up DuckDB connection...")
-
-# Create a new connection
-conn = duckdb.connect(database=":memory:")
-
-# Configure S3 credentials if provided
-if len(sys.argv) >= 3:
-    s3_access_key = sys.argv[1]
-    s3_secret_key = sys.argv[2]
-    print(f"⚙️ Configuring S3 with provided credentials...")
-    conn.execute("SET s3_region='us-east-1'")
-    conn.execute(f"SET s3_access_key_id='{s3_access_key}'")
-    conn.execute(f"SET s3_secret_access_key='{s3_secret_key}'")
-    conn.execute("SET s3_url_style='path'")
-    conn.execute("SET s3_use_ssl=true")
-    conn.execute("SET s3_allow_errors=true")
-
-# Test connection
-try:
-    print("Testing local file access...")
-    # Build the path
-    csv_path = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), "..", "test_data", "local_test.csv"
-    )
-    # Escape single quotes and backslashes for SQL
-    safe_path = csv_path.replace("'", "''").replace("\\", "\\\\")
-    # Use the safe path in the SQL query
-    sql = f"SELECT * FROM read_csv_auto('{safe_path}')"
-    result = conn.sql(sql).fetchdf()
-    print(f"✅ Local file access successful, found {len(result)} rows")
-    print(result)
-except Exception as e:
-    print(f"❌ Error with local file access: {e}")
-
-# Test S3 access if credentials were provided
-if len(sys.argv) >= 3:
+# Connection reused by every run in this process, so repeated setups do not
+# pay for a new database, its thread pool and extension loading each time
+_shared_conn: Optional[duckdb.DuckDBPyConnection] = None
+_s3_configured = False
+
+# Session settings applied by a run, reset before the next one
+_S3_SETTINGS = (
+    "s3_region",
+    "s3_access_key_id",
+    "s3_secret_access_key",
+    "s3_url_style",
+    "s3_use_ssl",
+    "s3_allow_errors",
+)
+
+
+def _get_conn() -> duckdb.DuckDBPyConnection:
+    """Return the shared in-memory connection, opening it on first use."""
+    global _shared_conn
+    if _shared_conn is None:
+        _shared_conn = duckdb.connect(database=":memory:")
+    return _shared_conn
+
+
+def _reset_s3_settings(conn: duckdb.DuckDBPyConnection) -> None:
+    """Restore the S3 settings a previous run changed."""
+    global _s3_configured
+    if _s3_configured:
+        conn.execute("".join(f"RESET {name};" for name in _S3_SETTINGS))
+        _s3_configured = False
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Set up the shared connection and test local and S3 access."""
+    global _s3_configured
+    args = sys.argv[1:] if argv is None else argv
+
+    print("🦆 Setting up DuckDB connection...")
+
+    conn = _get_conn()
+    _reset_s3_settings(conn)
+
+    # Configure S3 credentials if provided
+    if len(args) >= 2:
+        s3_access_key = args[0]
+        s3_secret_key = args[1]
+        print(f"⚙️ Configuring S3 with provided credentials...")
+        conn.execute("SET s3_region='us-east-1'")
+        conn.execute(f"SET s3_access_key_id='{s3_access_key}'")
+        conn.execute(f"SET s3_secret_access_key='{s3_secret_key}'")
+        conn.execute("SET s3_url_style='path'")
+        conn.execute("SET s3_use_ssl=true")
+        conn.execute("SET s3_allow_errors=true")
+        _s3_configured = True
+
+    # Test connection
     try:
-        print("Testing S3 configuration...")
-        config_result = conn.sql(
-            "SELECT current_setting('s3_access_key_id') as access_key"
-        ).fetchdf()
-        print(f"✅ S3 configuration verified: {config_result['access_key'][0][:4]}***")
-
-        # Try listing a bucket if specified
-        if len(sys.argv) >= 4:
-            bucket = sys.argv[3]
-            try:
-                print(f"Testing S3 bucket access for '{bucket}'...")
-                conn.sql(f"SELECT * FROM s3_list('{bucket}')").fetchdf()
-                print(f"✅ S3 bucket '{bucket}' access successful")
-            except Exception as e:
-                print(f"❌ Error accessing S3 bucket '{bucket}': {e}")
+        print("Testing local file access...")
+        # Build the path
+        csv_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "..",
+            "test_data",
+            "local_test.csv",
+        )
+        # Escape single quotes and backslashes for SQL
+        safe_path = csv_path.replace("'", "''").replace("\\", "\\\\")
+        # Use the safe path in the SQL query
+        sql = f"SELECT * FROM read_csv_auto('{safe_path}')"
+        # Arrow avoids building a pandas DataFrame just to count and print rows
+        result = conn.sql(sql).arrow()
+        print(f"✅ Local file access successful, found {result.num_rows} rows")
+        print(result)
     except Exception as e:
-        print(f"❌ Error with S3 configuration: {e}")
+        print(f"❌ Error with local file access: {e}")
+
+    # Test S3 access if credentials were provided
+    if len(args) >= 2:
+        try:
+            print("Testing S3 configuration...")
+            (access_key,) = conn.sql(
+                "SELECT current_setting('s3_access_key_id') as access_key"
+            ).fetchone()
+            print(f"✅ S3 configuration verified: {access_key[:4]}***")
+
+            # Try listing a bucket if specified
+            if len(args) >= 3:
+                bucket = args[2]
+                try:
+                    print(f"Testing S3 bucket access for '{bucket}'...")
+                    conn.sql(f"SELECT * FROM s3_list('{bucket}')").arrow()
+                    print(f"✅ S3 bucket '{bucket}' access successful")
+                except Exception as e:
+                    print(f"❌ Error accessing S3 bucket '{bucket}': {e}")
+        except Exception as e:
+            print(f"❌ Error with S3 configuration: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,22 +25,25 @@ def test_catalog_query():
 
     logger.info("Catalog already loaded by DuckDBManager")
 
-    # List tables in catalog
+    # Enumerate tables and their columns in a single metadata query instead of
+    # a SHOW TABLES plus one DESCRIBE per table
     logger.info("Listing tables in catalog...")
-    tables = con.sql("SHOW TABLES;").fetchall()
-    logger.info(f"Tables in catalog: {tables}")
+    tables = con.sql(
+        "SELECT table_name, list(column_name ORDER BY ordinal_position) "
+        "FROM information_schema.columns WHERE table_schema = 'main' "
+        "GROUP BY table_name ORDER BY table_name"
+    ).fetchall()
+    logger.info(f"Tables in catalog: {[table_name for table_name, _ in tables]}")
 
     # Test querying each table
-    for table in tables:
-        table_name = table[0]
+    for table_name, columns in tables:
         logger.info(f"Testing query for table {table_name}")
+        logger.info(f"Columns in {table_name}: {columns}")
         try:
-            # Get column list
-            columns = con.sql(f"DESCRIBE {table_name};").fetchall()
-            logger.info(f"Columns in {table_name}: {[col[0] for col in columns]}")
-
-            # Try a simple query
-            result = con.sql(f"SELECT * FROM {table_name} LIMIT 5;").fetchall()
+            # Try a simple query; identifiers cannot be bound as parameters, so
+            # the name is quoted instead
+            quoted = table_name.replace('"', '""')
+            result = con.sql(f'SELECT * FROM "{quoted}" LIMIT 5;').fetchall()
             row_count = len(result)
             logger.info(f"Query successful for {table_name}: {row_count} rows returned")
 
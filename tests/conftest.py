@@ -9,16 +9,15 @@ import sys
 import tempfile
 from pathlib import Path
 
+import duckdb
 import pytest
 import yaml
 
 # Add the project root to the path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from open_athena.database import DuckDBManager
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def temp_catalog():
     """Create a temporary catalog file with test tables."""
     with tempfile.NamedTemporaryFile(suffix=".yml", delete=False, mode="w") as f:
@@ -36,23 +35,46 @@ def temp_catalog():
         os.unlink(catalog_path)
 
 
+@pytest.fixture(scope="session")
+def session_connection():
+    """
+    Hold one in-memory database for the whole test session.
+
+    Opening a database starts its own thread pool, which dominates the cost of
+    short tests, so tests share one and db_connection clears it between them.
+    """
+    conn = duckdb.connect()
+    cursor = conn.cursor()
+    yield cursor
+    cursor.close()
+    conn.close()
+
+
 @pytest.fixture
-def db_connection():
-    """Get a fresh DuckDBManager instance for testing."""
-    manager = DuckDBManager(database_path=None)  # in-memory database
-    yield manager.connection
-    manager.close()
+def db_connection(session_connection):
+    """Get the shared in-memory connection, cleared of tables after each test."""
+    yield session_connection
+
+    # Drop what the test created so the next test starts from an empty schema
+    for name, table_type in session_connection.execute(
+        "SELECT table_name, table_type FROM information_schema.tables "
+        "WHERE table_schema = 'main'"
+    ).fetchall():
+        kind = "VIEW" if table_type == "VIEW" else "TABLE"
+        quoted = name.replace('"', '""')
+        session_connection.execute(f'DROP {kind} IF EXISTS "{quoted}"')
 
 
 @pytest.fixture
-def test_client():
+def test_client(monkeypatch):
     """Create a FastAPI test client."""
     from fastapi.testclient import TestClient
 
     from open_athena.api import app
 
-    # Set environment variables for testing
-    os.environ["OPENATHENA_USE_DUMMY_DATA"] = "true"
+    # Set environment variables for testing; restored after the test so later
+    # tests do not inherit dummy-data mode
+    monkeypatch.setenv("OPENATHENA_USE_DUMMY_DATA", "true")
 
     client = TestClient(app)
     yield client
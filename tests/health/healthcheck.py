@@ -6,19 +6,56 @@ Can be run as a standalone script or imported into other modules.
 """
 
 import argparse
+import functools
 import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
 
 # Add the project root to the path so we can import modules when running as script
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 
+# Number of table names included in the tables check details
+TABLE_PREVIEW_SIZE = 20
+
+
+def _parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+@functools.lru_cache(maxsize=16)
+def _format_second(seconds: int) -> str:
+    """Format a Unix time in whole seconds as a local ISO 8601 string."""
+    return datetime.fromtimestamp(seconds).isoformat()
+
+
+def _format_timestamp(time_ns: int) -> str:
+    """Format a Unix time in nanoseconds as a local ISO 8601 string."""
+    # Results created within the same second share the formatted prefix
+    seconds, nanos = divmod(time_ns, 1_000_000_000)
+    return f"{_format_second(seconds)}.{nanos // 1000:06d}"
+
+
+# Client errors that may succeed on a later attempt (timeout, rate limit)
+_RETRYABLE_CLIENT_ERRORS = frozenset((408, 429))
+
+
 class HealthCheckResult:
     """Class to hold health check results."""
 
@@ -26,10 +63,16 @@ class HealthCheckResult:
         self.name = name
         self.status = "unknown"
         self.message = ""
-        self.timestamp = datetime.now().isoformat()
+        # Formatted only when the result is reported
+        self._created_ns = time.time_ns()
         self.details = {}
         self.duration_ms = 0
 
+    @property
+    def timestamp(self) -> str:
+        """Creation time of the result in ISO 8601 format."""
+        return _format_timestamp(self._created_ns)
+
     def set_status(self, status: str, message: str, details: Optional[Dict] = None):
         """Set the status, message, and optional details."""
         self.status = status
@@ -58,6 +101,23 @@ class OpenAthenaHealthChecker:
         self.base_url = base_url
         self.results = []
 
+        # Reuse connections across checks so repeated polling does not pay for
+        # a new TCP (and TLS) handshake on every request
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def close(self):
+        """Close the pooled HTTP connections."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def check_api_health(self) -> HealthCheckResult:
         """
         Check if the API is responsive by calling the health endpoint.
@@ -66,12 +126,12 @@ class OpenAthenaHealthChecker:
         start_time = time.time()
 
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self._session.get(f"{self.base_url}/health", timeout=5)
             end_time = time.time()
             result.duration_ms = int((end_time - start_time) * 1000)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _parse_json(response)
                 if data.get("status") == "ok":
                     result.set_status("healthy", "API is responding correctly", data)
                 else:
@@ -114,20 +174,23 @@ class OpenAthenaHealthChecker:
         start_time = time.time()
 
         try:
-            response = requests.get(f"{self.base_url}/tables", timeout=5)
+            response = self._session.get(f"{self.base_url}/tables", timeout=5)
             end_time = time.time()
             result.duration_ms = int((end_time - start_time) * 1000)
 
             if response.status_code == 200:
-                data = response.json()
-                if "tables" in data and data["tables"]:
-                    table_count = len(data["tables"])
+                data = _parse_json(response)
+                tables = data.get("tables")
+                if tables:
+                    table_count = len(tables)
+                    # Only a bounded preview of the names is kept, so large
+                    # catalogs do not grow the report
                     result.set_status(
                         "healthy",
                         f"Found {table_count} tables",
                         {
                             "table_count": table_count,
-                            "tables": list(data["tables"].keys()),
+                            "tables": list(islice(tables, TABLE_PREVIEW_SIZE)),
                         },
                     )
                 else:
@@ -161,7 +224,7 @@ class OpenAthenaHealthChecker:
         try:
             # Try to run a simple query against system tables
             query = "SELECT 1 as health_check"
-            response = requests.post(
+            response = self._session.post(
                 f"{self.base_url}/sql",
                 data=query,
                 headers={"Content-Type": "text/plain"},
@@ -200,9 +263,16 @@ class OpenAthenaHealthChecker:
         Run all health checks and return results.
         """
         self.results = []
-        self.check_api_health()
-        self.check_tables_availability()
-        self.check_query_execution()
+        checks = (
+            self.check_api_health,
+            self.check_tables_availability,
+            self.check_query_execution,
+        )
+        # The checks are independent requests, so the total time is that of
+        # the slowest one rather than their sum. Results keep a fixed order.
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = [executor.submit(check) for check in checks]
+            self.results = [future.result() for future in futures]
         return self.results
 
     def get_overall_status(self) -> Tuple[str, str]:
@@ -224,6 +294,21 @@ class OpenAthenaHealthChecker:
         else:
             return "unknown", "System status could not be determined"
 
+    def has_permanent_failure(self) -> bool:
+        """
+        Check whether a failure is one that retrying will not fix.
+
+        A 4xx response (other than a timeout or rate limit) means the request
+        itself was rejected, so the server will answer the same way again.
+        """
+        for result in self.results:
+            status_code = result.details.get("status_code")
+            if status_code in _RETRYABLE_CLIENT_ERRORS:
+                continue
+            if status_code and 400 <= status_code < 500:
+                return True
+        return False
+
     def print_results(self, json_format: bool = False):
         """
         Print the results of the health checks.
@@ -282,16 +367,15 @@ def main():
 
     args = parser.parse_args()
 
-    checker = OpenAthenaHealthChecker(args.url)
-
-    if args.check == "api":
-        checker.check_api_health()
-    elif args.check == "tables":
-        checker.check_tables_availability()
-    elif args.check == "query":
-        checker.check_query_execution()
-    else:  # all
-        checker.run_all_checks()
+    with OpenAthenaHealthChecker(args.url) as checker:
+        if args.check == "api":
+            checker.check_api_health()
+        elif args.check == "tables":
+            checker.check_tables_availability()
+        elif args.check == "query":
+            checker.check_query_execution()
+        else:  # all
+            checker.run_all_checks()
 
     checker.print_results(json_format=args.json)
 
@@ -6,11 +6,15 @@ Can be used in monitoring systems, CI/CD pipelines, or as a Docker HEALTHCHECK.
 
 import argparse
 import os
+import random
 import sys
 import time
 
 from healthcheck import OpenAthenaHealthChecker
 
+# Upper bound on the wait between two attempts, in seconds
+MAX_RETRY_WAIT = 30
+
 
 def main():
     parser = argparse.ArgumentParser(description="Run OpenAthena health checks")
@@ -41,30 +45,37 @@ def main():
         "--wait",
         type=int,
         default=2,
-        help="Wait time between retries in seconds (default: 2)",
+        help="Initial wait time between retries in seconds, doubled on each "
+        "retry (default: 2)",
     )
 
     args = parser.parse_args()
 
-    # Create health checker
-    checker = OpenAthenaHealthChecker(args.url)
-
-    # Run checks with retries
-    success = False
-    for attempt in range(args.retries + 1):
-        if attempt > 0:
-            print(f"Attempt {attempt + 1}/{args.retries + 1}...")
-            time.sleep(args.wait)
+    # Create health checker; its connections are reused across retries
+    with OpenAthenaHealthChecker(args.url) as checker:
+        # Run checks with retries
+        success = False
+        for attempt in range(args.retries + 1):
+            if attempt > 0:
+                # Back off exponentially, with jitter so several runners do
+                # not retry in lockstep
+                delay = min(MAX_RETRY_WAIT, args.wait * 2 ** (attempt - 1))
+                delay += random.uniform(0, args.wait * 0.1)
+                print(f"Attempt {attempt + 1}/{args.retries + 1}...")
+                time.sleep(delay)
 
-        try:
-            checker.run_all_checks()
-            status, message = checker.get_overall_status()
+            try:
+                checker.run_all_checks()
+                status, message = checker.get_overall_status()
 
-            if status == "healthy":
-                success = True
-                break
-        except Exception as e:
-            print(f"Error during health check: {e}")
+                if status == "healthy":
+                    success = True
+                    break
+                if checker.has_permanent_failure():
+                    print("Server rejected a health check request, not retrying")
+                    break
+            except Exception as e:
+                print(f"Error during health check: {e}")
 
     # Print results
     checker.print_results(json_format=(args.format == "json"))
@@ -3,46 +3,39 @@ Integration tests for OpenAthena API endpoints.
 """
 
 import json
-import os
-import tempfile
 
 import pytest
 from fastapi.testclient import TestClient
 
-from open_athena.api import app
+from open_athena import api
 
+# The /sql endpoint reads the raw request body as the query text
+_SQL_HEADERS = {"Content-Type": "text/plain; charset=utf-8"}
 
-@pytest.fixture
-def client():
-    """Create a test client for the API."""
-    # Create a temporary catalog file in a temp directory
-    temp_dir = tempfile.gettempdir()
-    catalog_path = os.path.join(temp_dir, "openathena_test_catalog.yml")
 
-    # Set environment variables for testing
-    os.environ["OPENATHENA_USE_DUMMY_DATA"] = "true"
-    os.environ["OPENATHENA_CATALOG_PATH"] = catalog_path
+@pytest.fixture(scope="module", autouse=True)
+def api_environment(tmp_path_factory):
+    """Point the API at a dummy test catalog for the tests in this module."""
+    # Create the test catalog file; pytest removes the directory afterwards
+    catalog_path = tmp_path_factory.mktemp("api") / "catalog.yml"
+    catalog_path.write_text('test_table:\n  type: "dummy"\n')
 
-    # Create the test catalog file
-    with open(catalog_path, "w") as f:
-        f.write(
-            """test_table:
-  type: "dummy"
-"""
-        )
+    # The function-scoped monkeypatch fixture is unavailable at module scope
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # Set environment variables for testing; they are restored afterwards
+        monkeypatch.setenv("OPENATHENA_USE_DUMMY_DATA", "true")
+        monkeypatch.setenv("OPENATHENA_CATALOG_PATH", str(catalog_path))
+        # Build the database manager against this catalog
+        monkeypatch.setattr(api, "db_manager", None)
+        yield catalog_path
 
-    # Create test client
-    with TestClient(app) as client:
-        yield client
 
-    # Cleanup
-    if os.path.exists(catalog_path):
-        try:
-            os.remove(catalog_path)
-        except (PermissionError, OSError):
-            # Log but don't fail if we can't remove it
-            print(f"Warning: Could not remove temporary catalog file {catalog_path}")
-            pass
+@pytest.fixture(scope="module")
+def client(api_environment):
+    """Create a test client for the API, shared by the tests in this module."""
+    # App startup and the database open run once for all tests in the module
+    with TestClient(api.app) as client:
+        yield client
 
 
 def test_health_endpoint(client):
@@ -71,16 +64,21 @@ def test_tables_endpoint(client):
 def test_sql_query_endpoint(client):
     """Test executing SQL queries."""
     query = "SELECT * FROM test_table"
-    response = client.post("/sql", content=query)
-
-    # Verify response
-    assert response.status_code == 200
-    # The response should be Arrow format by default
-    assert response.headers["Content-Type"] == "application/vnd.apache.arrow.stream"
+    # Only the status and headers are checked, so the Arrow body is streamed
+    # and discarded instead of being read into memory
+    with client.stream(
+        "POST", "/sql", content=query.encode("utf-8"), headers=_SQL_HEADERS
+    ) as response:
+        # Verify response
+        assert response.status_code == 200
+        # The response should be Arrow format by default
+        assert response.headers["Content-Type"] == "application/vnd.apache.arrow.stream"
 
     # Test with an invalid query
     invalid_query = "SELECT * FROM non_existent_table"
-    response = client.post("/sql", content=invalid_query)
+    response = client.post(
+        "/sql", content=invalid_query.encode("utf-8"), headers=_SQL_HEADERS
+    )
     assert response.status_code == 500  # Expect an error
 
 
@@ -102,3 +100,22 @@ def test_catalog_reload_endpoint(client):
     assert ("tables" in data) or (
         "message" in data and "Catalog reloaded successfully" in data["message"]
     )
+
+
+def test_reset_session_endpoint(client):
+    """Test that resetting the session drops temporary tables."""
+    response = client.post(
+        "/sql",
+        content=b"CREATE TEMP TABLE scratch AS SELECT 1 AS n",
+        headers=_SQL_HEADERS,
+    )
+    assert response.status_code == 200
+
+    response = client.post("/admin/reset-session")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+    response = client.post(
+        "/sql?format=json", content=b"SELECT n FROM scratch", headers=_SQL_HEADERS
+    )
+    assert response.status_code == 500
@@ -8,6 +8,7 @@ from pathlib import Path
 import pytest
 import yaml
 
+from open_athena import catalog
 from open_athena.catalog import get_catalog_tables, load_catalog
 
 
@@ -54,3 +55,34 @@ def test_load_catalog_with_empty_file(db_connection, tmp_path):
     # No tables should be created
     with pytest.raises(Exception):
         db_connection.sql("SELECT * FROM non_existent_table").fetchall()
+
+
+def test_load_catalog_reuses_parsed_file(db_connection, tmp_path, monkeypatch):
+    """Test that an unchanged catalog is parsed once and re-read after edits."""
+    catalog_file = tmp_path / "catalog.yml"
+    catalog_file.write_text(yaml.dump({"cached_table": {"type": "dummy"}}))
+
+    parses = []
+    real_load = yaml.load
+    monkeypatch.setattr(
+        catalog.yaml,
+        "load",
+        lambda *args, **kwargs: parses.append(1) or real_load(*args, **kwargs),
+    )
+
+    load_catalog(db_connection, str(catalog_file))
+    load_catalog(db_connection, str(catalog_file))
+    assert len(parses) == 1
+
+    catalog_file.write_text(yaml.dump({"other_table": {"type": "dummy"}}))
+    load_catalog(db_connection, str(catalog_file))
+    assert len(parses) == 2
+    assert db_connection.sql("SELECT COUNT(*) FROM other_table").fetchone() == (3,)
+
+
+def test_db_connection_starts_empty(db_connection):
+    """Test that tables from earlier tests do not leak into later ones."""
+    tables = db_connection.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'main'"
+    ).fetchone()
+    assert tables == (0,)
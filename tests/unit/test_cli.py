@@ -0,0 +1,111 @@
+"""
+Unit tests for the OpenAthena command line interface.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from open_athena import cli
+
+
+@pytest.fixture
+def frame():
+    """A result with timestamps, missing values and non-ASCII text."""
+    return pd.DataFrame(
+        {
+            "ts": pd.to_datetime(["2024-01-01", None]),
+            "value": [1.5, np.nan],
+            "name": ["café", None],
+        }
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_output_is_the_same_with_and_without_orjson(
+    frame, use_orjson, monkeypatch, capsys
+):
+    """Test that the optional orjson speedup does not change JSON output."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(cli, "orjson", None)
+
+    cli.write_output(frame, None, "json")
+
+    output = capsys.readouterr().out
+    assert json.loads(output) == [
+        {"ts": "2024-01-01T00:00:00", "value": 1.5, "name": "café"},
+        {"ts": None, "value": None, "name": None},
+    ]
+    assert "café" in output
+
+
+def test_read_query_from_file(tmp_path):
+    """Test reading a query from a regular file."""
+    path = tmp_path / "query.sql"
+    path.write_text("SELECT 1;\n")
+
+    assert cli.read_query_from_file(str(path)) == "SELECT 1;"
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_read_query_from_fifo(tmp_path):
+    """Test reading a query from a pipe, whose reported size is 0."""
+    path = tmp_path / "query.fifo"
+    os.mkfifo(path)
+
+    def write_query():
+        with open(path, "w") as f:
+            f.write("SELECT 2")
+
+    writer = threading.Thread(target=write_query)
+    writer.start()
+    try:
+        assert cli.read_query_from_file(str(path)) == "SELECT 2"
+    finally:
+        writer.join()
+
+
+@pytest.mark.parametrize("limit", ["0", "5"])
+def test_limit_accepts_zero_and_positive_values(limit, monkeypatch):
+    """Test that --limit accepts 0 (no limit) and positive row counts."""
+    monkeypatch.setattr("sys.argv", ["open-athena-cli", "--limit", limit])
+
+    assert cli.parse_args().limit == int(limit)
+
+
+def test_limit_rejects_negative_values(monkeypatch, capsys):
+    """Test that a negative --limit is reported as a usage error."""
+    monkeypatch.setattr("sys.argv", ["open-athena-cli", "--limit", "-1"])
+
+    with pytest.raises(SystemExit) as excinfo:
+        cli.parse_args()
+
+    assert excinfo.value.code == 2
+    assert "--limit" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "rows, limit, footer",
+    [
+        (3, 2, "... (1 more row, use --limit to show more)"),
+        (5, 2, "... (3 more rows, use --limit to show more)"),
+        (5, 0, None),
+        (2, 5, None),
+    ],
+)
+def test_render_table_truncates_to_limit(rows, limit, footer):
+    """Test that the table preview is cut at the limit with a row count footer."""
+    data = pd.DataFrame({"id": range(rows)})
+
+    lines = cli._render_table(data, limit).splitlines()
+
+    if footer is not None:
+        assert lines.pop() == footer
+    # The last row shown is the last one within the limit
+    assert lines[-1].strip() == str(min(rows, limit or rows) - 1)
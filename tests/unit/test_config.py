@@ -0,0 +1,31 @@
+"""
+Unit tests for OpenAthena configuration functionality.
+"""
+
+import pytest
+
+from open_athena.config import Config, get_config
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """Make sure every test starts with a fresh configuration cache."""
+    get_config.cache_clear()
+    yield
+    get_config.cache_clear()
+
+
+def test_get_config_returns_cached_instance():
+    """Test that repeated calls return the same configuration instance."""
+    config = get_config()
+
+    assert isinstance(config, Config)
+    assert get_config() is config
+
+
+def test_get_config_cache_clear():
+    """Test that clearing the cache builds a new configuration instance."""
+    config = get_config()
+    get_config.cache_clear()
+
+    assert get_config() is not config
@@ -3,17 +3,50 @@ Unit tests for OpenAthena database functionality.
 """
 
 import os
+import threading
 
 import duckdb
 import pytest
 
-from open_athena.database import DuckDBManager
+from open_athena import database
+from open_athena.database import (
+    _LOCAL_ENDPOINT_RE,
+    DuckDBManager,
+    _closing_reader,
+    _first_env,
+    _is_read_only,
+    _parse_statements,
+)
 
 
-def test_duckdb_manager_init():
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """Run each test in an empty directory so no catalog.yml is loaded."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def duckdb_manager(tmp_path_factory):
+    """
+    Share one in-memory DuckDBManager between tests that only run queries.
+
+    Tests that close the manager or need specific settings create their own.
+    The queries are tiny, so a single thread and no metadata caching keep
+    startup to a minimum.
+    """
+    manager = DuckDBManager(
+        database_path=None,
+        catalog_path=str(tmp_path_factory.mktemp("db") / "missing.yml"),
+        threads=1,
+        enable_caching=False,
+    )
+    yield manager
+    manager.close()
+
+
+def test_duckdb_manager_init(duckdb_manager):
     """Test creating a DuckDBManager instance."""
-    # Create an in-memory database manager
-    manager = DuckDBManager(database_path=None)
+    manager = duckdb_manager
 
     # Verify it has a valid connection
     assert manager.connection is not None
@@ -23,26 +56,25 @@ def test_duckdb_manager_init():
     result = manager.connection.sql("SELECT 1 AS test").fetchall()
     assert result[0][0] == 1
 
-    # Clean up
-    manager.close()
-
 
-def test_execute_query():
+def test_execute_query(duckdb_manager):
     """Test executing a query and retrieving results."""
-    # Create an in-memory database manager
-    manager = DuckDBManager(database_path=None)
+    manager = duckdb_manager
 
-    # Create a test table
+    # Create a test table, dropped afterwards since the manager is shared
     manager.connection.sql("CREATE TABLE test_table (id INTEGER, name VARCHAR)")
-    manager.connection.sql(
-        "INSERT INTO test_table VALUES (1, 'test1'), (2, 'test2'), (3, 'test3')"
-    )
+    try:
+        manager.connection.sql(
+            "INSERT INTO test_table VALUES (1, 'test1'), (2, 'test2'), (3, 'test3')"
+        )
 
-    # Execute a query
-    result = manager.execute_query("SELECT * FROM test_table ORDER BY id")
+        # Execute a query
+        result = manager.execute_query("SELECT * FROM test_table ORDER BY id")
 
-    # Convert the relation to a result set we can index
-    rows = result.fetchall()
+        # Convert the relation to a result set we can index
+        rows = result.fetchall()
+    finally:
+        manager.connection.sql("DROP TABLE test_table")
 
     # Verify the results
     assert len(rows) == 3
@@ -51,21 +83,12 @@ def test_execute_query():
     assert rows[2][0] == 3
     assert rows[2][1] == "test3"
 
-    # Clean up
-    manager.close()
-
 
-def test_execute_query_with_error():
+def test_execute_query_with_error(duckdb_manager):
     """Test handling of SQL errors."""
-    # Create an in-memory database manager
-    manager = DuckDBManager(database_path=None)
-
     # Execute a query with syntax error
     with pytest.raises(Exception):
-        manager.execute_query("SELECT * FROM nonexistent_table")
-
-    # Clean up
-    manager.close()
+        duckdb_manager.execute_query("SELECT * FROM nonexistent_table")
 
 
 def test_connection_parameters():
@@ -94,3 +117,404 @@ def test_close_connection():
     # Attempting to use a closed connection should raise an exception
     with pytest.raises(Exception):
         con.sql("SELECT 1").fetchall()
+
+
+def test_acquire_pooled_connection():
+    """Test that pooled connections share the manager's database."""
+    manager = DuckDBManager(database_path=None, max_connections=2)
+    manager.connection.sql("CREATE TABLE pooled (id INTEGER)")
+    manager.connection.sql("INSERT INTO pooled VALUES (1), (2)")
+
+    with manager.acquire() as first, manager.acquire() as second:
+        assert first is not second
+        assert first.sql("SELECT COUNT(*) FROM pooled").fetchone()[0] == 2
+        assert second.sql("SELECT COUNT(*) FROM pooled").fetchone()[0] == 2
+
+    manager.close()
+
+
+def test_file_database_instance_is_shared(tmp_path):
+    """Test that managers opened on the same file share one database."""
+    db_path = str(tmp_path / "shared.duckdb")
+    first = DuckDBManager(database_path=db_path)
+    second = DuckDBManager(database_path=db_path)
+
+    first.connection.sql("CREATE TABLE shared_table AS SELECT 42 AS answer")
+    assert second.execute_query("SELECT answer FROM shared_table").fetchone() == (42,)
+
+    first.close()
+    second.close()
+
+
+def test_s3_credentials_refresh_after_ttl(monkeypatch):
+    """Test that stale S3 credentials are re-applied before a query runs."""
+    manager = DuckDBManager(database_path=None)
+    calls = []
+    monkeypatch.setattr(
+        manager, "configure_s3_credentials", lambda **kwargs: calls.append(kwargs)
+    )
+    manager._s3_args = {"access_key": "key"}
+    manager._secret_ttl = 900
+
+    manager.execute_query("SELECT 1").fetchall()
+    assert calls == []
+
+    manager._last_secret_refresh -= 900
+    manager.execute_query("SELECT 1").fetchall()
+    assert calls == [{"access_key": "key"}]
+
+    manager.close()
+
+
+def test_s3_credentials_refresh_rereads_environment(monkeypatch):
+    """Test that the TTL refresh picks up credentials rotated in the env."""
+    monkeypatch.setenv("OPENS3_ACCESS_KEY", "old-key")
+    manager = DuckDBManager(database_path=None)
+    seen = []
+    monkeypatch.setattr(
+        manager,
+        "configure_s3_credentials",
+        lambda **kwargs: seen.append(_first_env("OPENS3_ACCESS_KEY")),
+    )
+    manager._s3_args = {}
+    manager._secret_ttl = 900
+
+    monkeypatch.setenv("OPENS3_ACCESS_KEY", "new-key")
+    manager._last_secret_refresh -= 900
+    manager.execute_query("SELECT 1").fetchall()
+    assert seen == ["new-key"]
+
+    manager.close()
+
+
+def _configure_s3(manager, **kwargs):
+    """Run configure_s3_credentials and return the SQL it would execute."""
+    executed = []
+
+    class RecordingConnection:
+        def execute(self, sql, *args):
+            executed.append(sql)
+
+    connection = manager.connection
+    manager.connection = RecordingConnection()
+    try:
+        manager.configure_s3_credentials(**kwargs)
+    finally:
+        manager.connection = connection
+    return executed
+
+
+def test_invalid_region_falls_back_to_default(monkeypatch, caplog):
+    """Test that an unusual region from the environment does not stop startup."""
+    monkeypatch.setenv("AWS_REGION", "eu west 1'")
+    manager = DuckDBManager(database_path=None)
+
+    executed = _configure_s3(manager, access_key="key", secret_key="secret")
+
+    assert "REGION 'us-east-1'" in executed[0]
+    assert "Invalid S3 region" in caplog.text
+
+    manager.close()
+
+
+@pytest.mark.parametrize(
+    "endpoint, is_local",
+    [
+        ("localhost:8001", True),
+        ("http://127.0.0.1:9000/", True),
+        ("http://10.0.0.204:80", True),
+        ("http://192.168.1.5", True),
+        ("http://172.20.0.1:8001", True),
+        ("https://s3.amazonaws.com", False),
+        ("http://localhost.example.com", False),
+        ("http://10.example.com", False),
+        ("http://172.32.0.1", False),
+    ],
+)
+def test_local_endpoint_classification(endpoint, is_local):
+    """Test that loopback and private-network hosts are treated as OpenS3."""
+    assert bool(_LOCAL_ENDPOINT_RE.search(endpoint)) is is_local
+
+
+def test_opens3_endpoint_is_configured_without_protocol():
+    """Test that OpenS3 endpoints drop their scheme and use path-style URLs."""
+    manager = DuckDBManager(database_path=None)
+
+    executed = _configure_s3(
+        manager,
+        access_key="key",
+        secret_key="secret",
+        endpoint="http://localhost:8001/",
+    )
+
+    assert "ENDPOINT 'localhost:8001'" in executed[0]
+    assert "URL_STYLE 'path'" in executed[0]
+    assert "USE_SSL false" in executed[0]
+
+    manager.close()
+
+
+def test_httpfs_verification_is_remembered(tmp_path, monkeypatch):
+    """Test that a verified httpfs is recorded until DuckDB is reinstalled."""
+    sentinel = tmp_path / "cache" / "httpfs_ok"
+    monkeypatch.setattr(database, "HTTPFS_SENTINEL", sentinel)
+    assert not database._httpfs_verified()
+
+    database._mark_httpfs_verified()
+    assert database._httpfs_verified()
+
+    # A DuckDB installed after the verification must be verified again
+    duckdb_mtime = os.path.getmtime(duckdb.__file__)
+    os.utime(sentinel, (duckdb_mtime - 1, duckdb_mtime - 1))
+    assert not database._httpfs_verified()
+
+
+def test_httpfs_sentinel_write_failure_is_ignored(tmp_path, monkeypatch):
+    """Test that an unwritable cache directory does not break startup."""
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(database, "HTTPFS_SENTINEL", blocker / "httpfs_ok")
+
+    database._mark_httpfs_verified()
+
+    assert not database._httpfs_verified()
+
+
+def test_execute_query_threads_override():
+    """Test that a per-query thread count is restored after the query."""
+    manager = DuckDBManager(database_path=None, threads=2)
+
+    result = manager.execute_query("SELECT 42 AS answer", threads=1)
+    assert result.fetchall() == [(42,)]
+
+    threads = manager.connection.sql("SELECT current_setting('threads')").fetchone()
+    assert threads[0] == 2
+
+    manager.close()
+
+
+def test_warm_cache(tmp_path):
+    """Test warming the cache for readable and unreadable files."""
+    manager = DuckDBManager(database_path=None)
+    parquet_path = str(tmp_path / "warm.parquet")
+    manager.connection.execute(f"COPY (SELECT 1 AS id) TO '{parquet_path}'")
+
+    assert manager.warm_cache([parquet_path, str(tmp_path / "missing.csv")]) == 1
+
+    manager.close()
+
+
+def test_list_tables(tmp_path):
+    """Test listing tables and views registered in the database."""
+    manager = DuckDBManager(
+        database_path=None, catalog_path=str(tmp_path / "missing.yml")
+    )
+    manager.connection.sql("CREATE TABLE b_table (id INTEGER)")
+    manager.connection.sql("CREATE VIEW a_view AS SELECT 1 AS id")
+
+    assert manager.list_tables() == ["a_view", "b_table"]
+
+    manager.close()
+
+
+def test_execute_query_arrow(duckdb_manager):
+    """Test streaming a query result as Arrow record batches."""
+    reader = duckdb_manager.execute_query_arrow(
+        "SELECT range AS id FROM range(10)", batch_size=4
+    )
+    batches = list(reader)
+
+    assert sum(batch.num_rows for batch in batches) == 10
+    assert reader.schema.names == ["id"]
+
+
+def test_execute_query_arrow_writes_invalidate_results():
+    """Test that writes on the Arrow path use the writer and drop cached results."""
+    manager = DuckDBManager(database_path=None, result_cache_entries=4)
+    manager.execute_query("CREATE TABLE arrow_counts (n INTEGER)")
+    manager.execute_query("INSERT INTO arrow_counts VALUES (1)")
+
+    query = "SELECT COUNT(*) FROM arrow_counts"
+    assert manager.execute_query(query).fetchone() == (1,)
+
+    reader = manager.execute_query_arrow("INSERT INTO arrow_counts VALUES (2)")
+    assert reader.read_all().column(0).to_pylist() == [1]
+    assert manager.execute_query(query).fetchone() == (2,)
+
+    manager.close()
+
+
+def test_closing_reader_closes_connection_when_drained():
+    """Test that a streaming reader's connection is closed after the last batch."""
+    conn = duckdb.connect()
+    reader = _closing_reader(
+        conn.execute("SELECT range AS id FROM range(10)").fetch_record_batch(4), conn
+    )
+
+    assert sum(batch.num_rows for batch in reader) == 10
+    with pytest.raises(duckdb.ConnectionException):
+        conn.execute("SELECT 1")
+
+
+def test_writes_and_reads_use_separate_connections():
+    """Test that writes go through the writer and are visible to readers."""
+    manager = DuckDBManager(database_path=None)
+
+    manager.execute_query("CREATE TABLE events (id INTEGER)")
+    manager.execute_query("INSERT INTO events VALUES (1), (2)")
+
+    assert manager.execute_query("SELECT COUNT(*) FROM events").fetchone() == (2,)
+    assert manager.execute_query("  with t AS (SELECT 1) SELECT * FROM t").fetchall()
+
+    manager.close()
+
+
+def test_concurrent_queries_do_not_share_pending_results():
+    """Test that results stay readable while other threads reuse the pool."""
+    manager = DuckDBManager(database_path=None, max_connections=4)
+    manager.execute_query("CREATE TABLE numbers AS SELECT range AS n FROM range(1000)")
+    errors = []
+
+    def run_queries():
+        try:
+            for _ in range(50):
+                rows = manager.execute_query("SELECT n FROM numbers").fetchall()
+                assert len(rows) == 1000
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=run_queries) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+
+    manager.close()
+
+
+def test_session_state_survives_between_statements():
+    """Test that temporary tables and USE apply to the statements that follow."""
+    manager = DuckDBManager(database_path=None)
+
+    manager.execute_query("CREATE TEMP TABLE scratch AS SELECT 7 AS n")
+    assert manager.execute_query("SELECT n FROM scratch").fetchone() == (7,)
+    reader = manager.execute_query_arrow("SELECT n FROM scratch")
+    assert reader.read_all().column(0).to_pylist() == [7]
+
+    manager.execute_query("CREATE SCHEMA staging")
+    manager.execute_query("USE staging")
+    manager.execute_query("CREATE TABLE loaded AS SELECT 1 AS id")
+    assert manager.execute_query("SELECT id FROM loaded").fetchone() == (1,)
+
+    manager.close()
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["SELECT 1", "  with t AS (SELECT 1) SELECT * FROM t", "DESCRIBE SELECT 1"],
+)
+def test_single_selects_are_read_only(query):
+    """Test that single SELECT statements may run on pooled readers."""
+    assert _is_read_only(_parse_statements(query))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT 1; INSERT INTO c VALUES (1)",
+        "WITH x AS (SELECT 1) INSERT INTO c SELECT * FROM x",
+        "BEGIN TRANSACTION",
+        "COMMIT",
+        "ROLLBACK",
+        "ATTACH 'other.db'",
+        "SELEC 1",
+    ],
+)
+def test_other_statements_go_to_the_writer(query):
+    """Test that anything but a single SELECT is routed to the writer."""
+    assert not _is_read_only(_parse_statements(query))
+
+
+def test_transaction_sees_its_own_writes():
+    """Test that reads inside a transaction run on the writer until it ends."""
+    manager = DuckDBManager(database_path=None)
+    manager.execute_query("CREATE TABLE ledger (n INTEGER)")
+
+    manager.execute_query("BEGIN TRANSACTION")
+    manager.execute_query("INSERT INTO ledger VALUES (1)")
+    assert manager.execute_query("SELECT COUNT(*) FROM ledger").fetchone() == (1,)
+    manager.execute_query("ROLLBACK")
+
+    assert not manager._in_transaction
+    assert manager.execute_query("SELECT COUNT(*) FROM ledger").fetchone() == (0,)
+
+    manager.close()
+
+
+def test_multi_statement_writes_run_on_the_writer():
+    """Test that writes after a leading SELECT are made through the writer."""
+    manager = DuckDBManager(database_path=None)
+    manager.execute_query("CREATE TABLE batch (n INTEGER)")
+
+    manager.execute_query("SELECT 1; INSERT INTO batch VALUES (1)")
+    manager.execute_query("WITH x AS (SELECT 2) INSERT INTO batch SELECT * FROM x")
+
+    assert manager.execute_query("SELECT SUM(n) FROM batch").fetchone() == (3,)
+
+    manager.close()
+
+
+def test_reset_session_resumes_pooled_reads():
+    """Test that resetting the session drops temporary state and unpins the writer."""
+    manager = DuckDBManager(database_path=None)
+    manager.execute_query("CREATE TEMP TABLE scratch AS SELECT 7 AS n")
+    manager.execute_query("BEGIN TRANSACTION")
+    assert manager._pinned_to_writer()
+
+    manager.reset_session()
+
+    assert not manager._pinned_to_writer()
+    with pytest.raises(duckdb.CatalogException):
+        manager.execute_query("SELECT n FROM scratch")
+
+    manager.close()
+
+
+def test_result_cache_invalidated_by_writes():
+    """Test that cached read results are dropped after a write."""
+    manager = DuckDBManager(database_path=None, result_cache_entries=2)
+    manager.execute_query("CREATE TABLE counters (n INTEGER)")
+    manager.execute_query("INSERT INTO counters VALUES (1)")
+
+    query = "SELECT SUM(n) FROM counters"
+    assert manager.execute_query(query).fetchone() == (1,)
+    assert len(manager._result_cache) == 1
+    assert manager.execute_query(query).fetchone() == (1,)
+
+    manager.execute_query("INSERT INTO counters VALUES (2)")
+    assert len(manager._result_cache) == 0
+    assert manager.execute_query(query).fetchone() == (3,)
+
+    manager.close()
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        "SELECT 1; INSERT INTO tallies VALUES (5)",
+        "WITH x AS (SELECT 5) INSERT INTO tallies SELECT * FROM x",
+    ],
+)
+def test_result_cache_invalidated_by_disguised_writes(write):
+    """Test that writes behind a SELECT or CTE still drop cached results."""
+    manager = DuckDBManager(database_path=None, result_cache_entries=2)
+    manager.execute_query("CREATE TABLE tallies (n INTEGER)")
+
+    query = "SELECT COUNT(*) FROM tallies"
+    assert manager.execute_query(query).fetchone() == (0,)
+    manager.execute_query(write)
+    assert manager.execute_query(query).fetchone() == (1,)
+
+    manager.close()
@@ -0,0 +1,530 @@
+"""
+Unit tests for the OpenS3 file proxy.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from open_athena import opens3_file_proxy
+from open_athena.opens3_file_proxy import OpenS3FileProxy, S3FIFOCache
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    """Create a proxy with an isolated cache directory."""
+    return OpenS3FileProxy(
+        opens3_url="http://localhost:8001",
+        username="user",
+        password="pass",
+        cache_dir=str(tmp_path / "cache"),
+    )
+
+
+def test_update_catalog_query_resolves_each_url_once(proxy, monkeypatch):
+    """Test that repeated URLs are downloaded once and all replaced."""
+    calls = []
+
+    def fake_convert(url):
+        calls.append(url)
+        return "/cache/" + url.rsplit("/", 1)[-1]
+
+    monkeypatch.setattr(proxy, "convert_url_to_local_path", fake_convert)
+
+    query = (
+        "SELECT * FROM read_csv_auto('s3://bucket/a.csv') "
+        "UNION ALL SELECT * FROM read_csv_auto('s3://bucket/a.csv') "
+        "UNION ALL SELECT * FROM read_parquet('s3://bucket/b.parquet')"
+    )
+    updated = proxy.update_catalog_query(query)
+
+    assert sorted(calls) == ["s3://bucket/a.csv", "s3://bucket/b.parquet"]
+    assert "s3://" not in updated
+    assert updated.count("'/cache/a.csv'") == 2
+
+
+def test_s3fifo_keeps_hot_entries_during_scans():
+    """Test that entries hit again survive a scan of one-time entries."""
+    cache = S3FIFOCache(capacity=10)
+    cache.insert("hot")
+    cache.access("hot")
+
+    evicted = []
+    for i in range(50):
+        evicted.extend(cache.insert(f"scan-{i}"))
+
+    assert "hot" in cache
+    assert "hot" not in evicted
+    assert len(cache) == 10
+    assert len(evicted) == 41
+
+
+def test_download_files_batched(proxy, monkeypatch):
+    """Test that each distinct key in a batch is downloaded once."""
+    calls = []
+
+    def fake_download(bucket, key):
+        calls.append((bucket, key))
+        return None if key == "missing.csv" else f"/cache/{bucket}/{key}"
+
+    monkeypatch.setattr(proxy, "download_file", fake_download)
+
+    result = proxy.download_files_batched(
+        "bucket", ["b.csv", "a.csv", "b.csv", "missing.csv"]
+    )
+
+    assert sorted(calls) == [
+        ("bucket", "a.csv"),
+        ("bucket", "b.csv"),
+        ("bucket", "missing.csv"),
+    ]
+    assert result == {
+        "a.csv": "/cache/bucket/a.csv",
+        "b.csv": "/cache/bucket/b.csv",
+        "missing.csv": None,
+    }
+
+
+class FakeResponse:
+    """Minimal stand-in for a requests response."""
+
+    def __init__(self, status_code=200, payload=None, content=b"", headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.raw = io.BytesIO(content)
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.raw.close()
+
+    def json(self):
+        return self._payload
+
+
+def test_list_objects_reuses_recent_listing(proxy, monkeypatch):
+    """Test that bucket listings are cached until invalidated."""
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(payload={"objects": [{"key": "a.csv"}]})
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    assert proxy.list_objects("bucket") == [{"key": "a.csv", "name": "a.csv"}]
+    assert proxy.list_objects("bucket") == [{"key": "a.csv", "name": "a.csv"}]
+    assert len(calls) == 1
+
+    proxy.invalidate_listing("bucket")
+    proxy.list_objects("bucket")
+    assert len(calls) == 2
+
+
+def test_update_catalog_query_keeps_unresolved_urls(proxy, monkeypatch):
+    """Test that URLs which cannot be downloaded are left untouched."""
+    monkeypatch.setattr(proxy, "convert_url_to_local_path", lambda url: None)
+
+    query = "SELECT * FROM read_csv_auto('s3://bucket/missing.csv')"
+
+    assert proxy.update_catalog_query(query) == query
+
+
+def test_update_catalog_query_escapes_single_quotes(proxy, monkeypatch):
+    """Test that local paths are escaped for single-quoted SQL strings."""
+    monkeypatch.setattr(
+        proxy, "convert_url_to_local_path", lambda url: "/cache/o'brien.csv"
+    )
+
+    assert (
+        proxy.update_catalog_query("SELECT * FROM read_csv_auto('http://host/b/o.csv')")
+        == "SELECT * FROM read_csv_auto('/cache/o''brien.csv')"
+    )
+    assert (
+        proxy.update_catalog_query('SELECT * FROM read_csv_auto("s3://b/o.csv")')
+        == 'SELECT * FROM read_csv_auto("/cache/o\'brien.csv")'
+    )
+
+
+def test_convert_url_to_local_path_is_memoized(proxy, monkeypatch, tmp_path):
+    """Test that resolved URLs are reused until the cache is invalidated."""
+    local_file = tmp_path / "a.csv"
+    local_file.write_text("id\n1\n")
+    calls = []
+
+    def fake_convert(url):
+        calls.append(url)
+        return str(local_file)
+
+    monkeypatch.setattr(proxy, "_convert_url_to_local_path", fake_convert)
+
+    assert proxy.convert_url_to_local_path("s3://bucket/a.csv") == str(local_file)
+    assert proxy.convert_url_to_local_path("s3://bucket/a.csv") == str(local_file)
+    assert len(calls) == 1
+
+    proxy._invalidate_resolved_urls()
+    proxy.convert_url_to_local_path("s3://bucket/a.csv")
+    assert len(calls) == 2
+
+    # A remembered path whose file disappeared is resolved again
+    local_file.unlink()
+    proxy.convert_url_to_local_path("s3://bucket/a.csv")
+    assert len(calls) == 3
+
+
+def test_resolved_urls_expire(proxy, monkeypatch, tmp_path):
+    """Test that resolved URLs are revalidated after their TTL and on reload."""
+    local_file = tmp_path / "a.csv"
+    local_file.write_text("id\n1\n")
+    calls = []
+
+    def fake_convert(url):
+        calls.append(url)
+        return str(local_file)
+
+    monkeypatch.setattr(proxy, "_convert_url_to_local_path", fake_convert)
+    monkeypatch.setattr(opens3_file_proxy, "_proxy_instance", proxy)
+
+    # Plain URLs are kept for the cache expiration
+    proxy.convert_url_to_local_path("s3://bucket/a.csv")
+    proxy.convert_url_to_local_path("s3://bucket/a.csv")
+    assert len(calls) == 1
+
+    # A catalog reload drops every entry
+    opens3_file_proxy.invalidate_resolved_urls()
+    proxy.convert_url_to_local_path("s3://bucket/a.csv")
+    assert len(calls) == 2
+
+    proxy.cache_expiration = 0
+    proxy.convert_url_to_local_path("s3://bucket/b.csv")
+    proxy.convert_url_to_local_path("s3://bucket/b.csv")
+    assert len(calls) == 4
+
+    # Wildcards are kept only as long as a bucket listing
+    monkeypatch.setattr(opens3_file_proxy, "LISTING_CACHE_TTL", 0)
+    proxy.cache_expiration = 3600
+    proxy.convert_url_to_local_path("s3://bucket/*.csv")
+    proxy.convert_url_to_local_path("s3://bucket/*.csv")
+    assert calls[-2:] == ["s3://bucket/*.csv", "s3://bucket/*.csv"]
+
+
+def test_download_file_streams_body_to_cache(proxy, monkeypatch):
+    """Test that a downloaded object is written to the cache and reused."""
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(content=b"id\n1\n" * 1000)
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    local_path = proxy.download_file("bucket", "dir/a.csv")
+
+    with open(local_path, "rb") as f:
+        assert f.read() == b"id\n1\n" * 1000
+    assert proxy.download_file("bucket", "dir/a.csv") == local_path
+    assert len(calls) == 1
+
+
+def test_download_file_discards_partial_download(proxy, monkeypatch):
+    """Test that an interrupted download leaves nothing in the cache."""
+
+    class BrokenStream(io.BytesIO):
+        def read(self, *args):
+            raise ConnectionError("connection reset")
+
+    def fake_get(url, **kwargs):
+        response = FakeResponse()
+        response.raw = BrokenStream()
+        return response
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    assert proxy.download_file("bucket", "a.csv") is None
+    assert os.listdir(os.path.join(proxy.cache_dir, "bucket")) == []
+
+
+def test_cache_metadata_persists_across_instances(proxy, monkeypatch):
+    """Test that cached files are recognized by a new proxy instance."""
+    monkeypatch.setattr(
+        proxy._session, "get", lambda url, **kwargs: FakeResponse(content=b"id\n")
+    )
+    local_path = proxy.download_file("bucket", "a.csv")
+
+    reopened = OpenS3FileProxy(opens3_url=proxy.opens3_url, cache_dir=proxy.cache_dir)
+    monkeypatch.setattr(
+        reopened._session, "get", lambda url, **kwargs: pytest.fail("re-downloaded")
+    )
+
+    assert reopened.download_file("bucket", "a.csv") == local_path
+    assert "bucket/a.csv".replace("/", os.sep) in reopened._cache_policy
+
+
+def test_legacy_json_metadata_is_imported(tmp_path):
+    """Test that metadata from the JSON format is moved into SQLite."""
+    cache_dir = tmp_path / "cache"
+    (cache_dir / "bucket").mkdir(parents=True)
+    (cache_dir / "bucket" / "a.csv").write_text("id\n")
+    files = {"bucket/a.csv": {"last_access": time.time(), "size": 3}}
+    (cache_dir / "cache_metadata.json").write_text(json.dumps({"files": files}))
+
+    proxy = OpenS3FileProxy(
+        opens3_url="http://localhost:8001", cache_dir=str(cache_dir)
+    )
+
+    assert not (cache_dir / "cache_metadata.json").exists()
+    entry = proxy._get_cache_entry("bucket/a.csv")
+    assert entry == (files["bucket/a.csv"]["last_access"], None, None)
+
+
+def test_list_objects_sends_prefix_to_server(proxy, monkeypatch):
+    """Test that prefixes are pushed to the server and filtered locally."""
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(params)
+        # Simulate a server that ignores the prefix parameter
+        return FakeResponse(payload=[{"key": "logs/a.csv"}, {"key": "b.csv"}])
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    assert [o["name"] for o in proxy.list_objects("bucket", prefix="logs/")] == [
+        "logs/a.csv"
+    ]
+    assert calls == [{"prefix": "logs/"}]
+
+    # A full listing is cached and also answers prefixed requests
+    assert len(proxy.list_objects("bucket")) == 2
+    assert [o["name"] for o in proxy.list_objects("bucket", prefix="b")] == ["b.csv"]
+    assert calls == [{"prefix": "logs/"}, None]
+
+
+def test_wildcard_url_downloads_every_match(proxy, monkeypatch):
+    """Test that a wildcard resolves to the list of matching files only."""
+    objects = {"logs/a.csv": b"id\n1\n", "logs/b.csv": b"id\n2\n", "c.txt": b""}
+
+    def fake_get(url, params=None, **kwargs):
+        if url.endswith("/objects"):
+            return FakeResponse(payload=[{"key": key} for key in objects])
+        return FakeResponse(content=objects[url.split("/objects/", 1)[1]])
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    # A file cached for another table in the same folder must not be picked up
+    os.makedirs(os.path.join(proxy.cache_dir, "bucket", "logs"), exist_ok=True)
+    with open(os.path.join(proxy.cache_dir, "bucket", "logs", "old.csv"), "w") as f:
+        f.write("id\n3\n")
+
+    local_paths = proxy.convert_url_to_local_path("s3://bucket/logs/*.csv")
+
+    logs_dir = os.path.join(proxy.cache_dir, "bucket", "logs")
+    assert local_paths == [
+        os.path.join(logs_dir, "a.csv"),
+        os.path.join(logs_dir, "b.csv"),
+    ]
+
+    # The list is substituted into the query as a SQL list of paths
+    query = proxy._substitute_urls(
+        "SELECT * FROM read_csv_auto('s3://bucket/logs/*.csv')",
+        {"s3://bucket/logs/*.csv": ["/cache/a.csv", "/cache/o'b.csv"]},
+    )
+    assert query == "SELECT * FROM read_csv_auto(['/cache/a.csv', '/cache/o''b.csv'])"
+
+
+def test_expired_file_is_revalidated_with_etag(proxy, monkeypatch):
+    """Test that an expired file is kept when the server answers 304."""
+    requests_seen = []
+
+    def fake_get(url, headers=None, **kwargs):
+        requests_seen.append(headers)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(status_code=304)
+        return FakeResponse(content=b"id\n1\n", headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    local_path = proxy.download_file("bucket", "a.csv")
+    proxy.cache_expiration = 0
+
+    assert proxy.download_file("bucket", "a.csv") == local_path
+    assert requests_seen == [None, {"If-None-Match": '"v1"'}]
+    with open(local_path, "rb") as f:
+        assert f.read() == b"id\n1\n"
+
+
+def test_download_all_catalog_files_resolves_catalog_once(proxy, monkeypatch):
+    """Test that URLs shared between catalog entries are resolved once."""
+    calls = []
+
+    def fake_convert(url):
+        calls.append(url)
+        return "/cache/" + url.rsplit("/", 1)[-1]
+
+    monkeypatch.setattr(opens3_file_proxy, "_proxy_instance", proxy)
+    monkeypatch.setattr(proxy, "convert_url_to_local_path", fake_convert)
+
+    catalog = {
+        "a": {"query": "SELECT * FROM read_csv_auto('s3://bucket/a.csv')"},
+        "b": {"query": "SELECT * FROM read_csv_auto('s3://bucket/a.csv')"},
+        "c": {"type": "dummy"},
+    }
+    updated = opens3_file_proxy.download_all_catalog_files(catalog)
+
+    assert calls == ["s3://bucket/a.csv"]
+    assert updated["b"]["query"] == "SELECT * FROM read_csv_auto('/cache/a.csv')"
+    assert updated["c"] == {"type": "dummy"}
+
+
+def test_wildcard_matching_uses_shell_globs(proxy, monkeypatch):
+    """Test wildcard patterns, including the csv/ folder fallback."""
+    names = [
+        "logs/a.csv",
+        "logs/2024/b.csv",
+        "logs/c.parquet",
+        "logs/E.PARQUET",
+        "d.csv",
+        "F.CSV",
+    ]
+    monkeypatch.setattr(
+        proxy._session,
+        "get",
+        lambda url, **kwargs: FakeResponse(payload=[{"key": n} for n in names]),
+    )
+
+    assert proxy._match_objects("bucket", "logs/*.csv") == [
+        "logs/a.csv",
+        "logs/2024/b.csv",
+    ]
+    # Extensions match regardless of case
+    assert proxy._match_objects("bucket", "logs/**/*.parquet") == [
+        "logs/c.parquet",
+        "logs/E.PARQUET",
+    ]
+    assert proxy._match_objects("bucket", "csv/*") == [
+        "logs/a.csv",
+        "logs/2024/b.csv",
+        "d.csv",
+        "F.CSV",
+    ]
+
+
+def test_concurrent_downloads_of_one_object_are_shared(proxy, monkeypatch):
+    """Test that simultaneous requests for an object trigger one transfer."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        started.set()
+        release.wait(timeout=5)
+        return FakeResponse(content=b"id\n1\n")
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(proxy.download_file, "bucket", "a.csv")
+        assert started.wait(timeout=5)
+        second = executor.submit(proxy.download_file, "bucket", "a.csv")
+        release.set()
+        assert first.result() == second.result()
+
+    assert len(calls) == 1
+    assert proxy._inflight == {}
+
+
+def test_cache_policy_is_only_used_under_the_metadata_lock(proxy, monkeypatch):
+    """Test that concurrent hits, downloads and expiry update the policy safely."""
+    policy = proxy._cache_policy
+    unlocked = []
+
+    def guarded(method):
+        def wrapper(*args, **kwargs):
+            if not proxy._metadata_lock._is_owned():
+                unlocked.append(method.__name__)
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("access", "insert", "remove"):
+        monkeypatch.setattr(policy, name, guarded(getattr(policy, name)))
+    monkeypatch.setattr(
+        proxy._session, "get", lambda url, **kwargs: FakeResponse(content=b"id\n")
+    )
+    keys = [f"k{i}.csv" for i in range(20)]
+    for key in keys:
+        proxy.download_file("bucket", key)
+
+    def churn(worker):
+        for round_ in range(20):
+            for key in keys:
+                proxy.download_file("bucket", key)
+            proxy.download_file("bucket", f"new-{worker}-{round_}.csv")
+            proxy.clean_expired_cache()
+
+    monkeypatch.setattr(proxy, "cache_expiration", 0.001)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(churn, range(4)))
+
+    assert unlocked == []
+    assert policy.total_bytes == sum(policy.sizes.values())
+
+
+def test_s3fifo_enforces_byte_limit():
+    """Test that entries are evicted once their combined size is too large."""
+    cache = S3FIFOCache(capacity=100, max_bytes=100)
+    cache.insert("hot", 40)
+    cache.access("hot")
+
+    evicted = []
+    for i in range(5):
+        evicted.extend(cache.insert(f"scan-{i}", 30))
+
+    assert "hot" in cache
+    assert cache.total_bytes <= 100
+    assert evicted == ["scan-0", "scan-1", "scan-2"]
+
+    # An entry larger than the limit is still kept on its own
+    assert "big" not in cache.insert("big", 500)
+    assert list(cache.sizes) == ["big"]
+
+
+def test_get_proxy_instance_builds_one_proxy_under_concurrency(tmp_path, monkeypatch):
+    """Test that concurrent first calls share a single proxy instance."""
+    monkeypatch.setattr(opens3_file_proxy, "_proxy_instance", None)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(
+                opens3_file_proxy.get_proxy_instance, cache_dir=str(tmp_path)
+            )
+            for _ in range(8)
+        ]
+        proxies = {id(future.result()) for future in futures}
+
+    assert len(proxies) == 1
+
+
+def test_alternate_path_is_remembered(proxy, monkeypatch):
+    """Test that a key found at the bucket root is not requested again."""
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        if url.endswith("/objects/csv/a.csv"):
+            return FakeResponse(status_code=404)
+        return FakeResponse(content=b"id\n1\n")
+
+    monkeypatch.setattr(proxy._session, "get", fake_get)
+
+    local_path = proxy.download_file("bucket", "csv/a.csv")
+    assert local_path == os.path.join(proxy.cache_dir, "bucket", "a.csv")
+    assert proxy.download_file("bucket", "csv/a.csv") == local_path
+    assert len(calls) == 2
@@ -0,0 +1,146 @@
+"""
+Unit tests for the OpenS3 authentication middleware.
+"""
+
+import pytest
+
+from open_athena import s3_auth_middleware
+from open_athena.s3_auth_middleware import (
+    configure_httpfs_headers_auth,
+    get_opens3_credentials,
+    invalidate_opens3_credentials,
+)
+
+_ENV_VARS = [
+    "OPENS3_ENDPOINT",
+    "S3_ENDPOINT",
+    "OPENS3_USER",
+    "OPENS3_ACCESS_KEY",
+    "S3_USER",
+    "S3_ACCESS_KEY_ID",
+    "OPENS3_PASSWORD",
+    "OPENS3_SECRET_KEY",
+    "S3_PASSWORD",
+    "S3_SECRET_ACCESS_KEY",
+]
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    """Isolate the credential environment variables and the cached lookup."""
+    for name in _ENV_VARS:
+        # Set then delete so monkeypatch restores values the code overwrites
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+    invalidate_opens3_credentials()
+    yield monkeypatch
+    invalidate_opens3_credentials()
+
+
+def test_get_opens3_credentials_is_cached(clean_env):
+    """Test that credentials are resolved once until invalidated."""
+    clean_env.setenv("OPENS3_ENDPOINT", "opens3.local:8001/")
+    clean_env.setenv("OPENS3_USER", "alice")
+    clean_env.setenv("OPENS3_PASSWORD", "secret")
+
+    assert get_opens3_credentials() == ("http://opens3.local:8001", "alice", "secret")
+
+    clean_env.setenv("OPENS3_USER", "bob")
+    assert get_opens3_credentials()[1] == "alice"
+
+    invalidate_opens3_credentials()
+    assert get_opens3_credentials()[1] == "bob"
+
+
+def test_get_opens3_credentials_defaults(clean_env):
+    """Test the local testing defaults when nothing is configured."""
+    assert get_opens3_credentials() == ("http://localhost:8001", "admin", "password")
+    assert s3_auth_middleware._resolve_opens3_credentials.cache_info().currsize == 1
+
+
+class FakeConnection:
+    """Records the statements executed on it."""
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = {}
+
+    def execute(self, sql, parameters=None):
+        self.statements.append(sql)
+        if parameters is not None:
+            self.parameters[sql] = parameters
+
+    def sql(self, sql):
+        self.statements.append(sql)
+
+
+def test_configure_httpfs_headers_auth_skips_repeat_calls(clean_env):
+    """Test that httpfs is installed once and unchanged settings are skipped."""
+    clean_env.setattr(s3_auth_middleware, "_HTTPFS_INSTALLED", False)
+    clean_env.setattr(s3_auth_middleware, "_CACHE_HTTPFS_INSTALLED", None)
+    conn = FakeConnection()
+
+    configure_httpfs_headers_auth(conn, "alice", "o'brien", "http://opens3:8001")
+    configure_httpfs_headers_auth(conn, "alice", "o'brien", "http://opens3:8001")
+
+    executed = [sql for sql in conn.statements if "httpfs_version" not in sql]
+    assert executed[0] == "INSTALL httpfs"
+    assert executed[1].startswith("LOAD httpfs;")
+    # The thread count is database-wide and left to the connection's owner
+    assert "threads" not in executed[1]
+    assert executed[2] == "INSTALL cache_httpfs FROM community"
+    assert executed[3].startswith("LOAD cache_httpfs;")
+    assert len(executed) == 7
+    assert conn.parameters["SET s3_secret_access_key=?"] == ["o'brien"]
+
+    # New credentials are applied without installing httpfs again
+    before = len(conn.statements)
+    configure_httpfs_headers_auth(conn, "bob", "secret", "http://opens3:8001")
+    executed = [sql for sql in conn.statements[before:] if "httpfs_version" not in sql]
+    assert len(executed) == 5
+    assert executed[0].startswith("LOAD httpfs;")
+    assert executed[1].startswith("LOAD cache_httpfs;")
+    assert conn.parameters["SET s3_access_key_id=?"] == ["bob"]
+
+
+def test_httpfs_cache_disabled_when_unavailable(clean_env):
+    """Test that a failed cache_httpfs install is not retried."""
+    clean_env.setattr(s3_auth_middleware, "_CACHE_HTTPFS_INSTALLED", None)
+
+    class OfflineConnection(FakeConnection):
+        def execute(self, sql, parameters=None):
+            if "cache_httpfs" in sql:
+                raise RuntimeError("offline")
+            super().execute(sql, parameters)
+
+    conn = OfflineConnection()
+    configure_httpfs_headers_auth(conn, "alice", "secret", "http://opens3:8001")
+    assert s3_auth_middleware._CACHE_HTTPFS_INSTALLED is False
+    # Credentials are still applied without the cache
+    assert conn.parameters["SET s3_access_key_id=?"] == ["alice"]
+
+    s3_auth_middleware._enable_httpfs_cache(conn)
+    assert not any("cache_httpfs" in sql for sql in conn.statements)
+
+
+@pytest.mark.parametrize(
+    "endpoint, expected",
+    [
+        ("localhost:8001", ("http://localhost:8001", "localhost:8001")),
+        ("10.0.0.204:80//", ("http://10.0.0.204:80", "10.0.0.204:80")),
+        ("http://opens3:8001/", ("http://opens3:8001", "opens3:8001")),
+        (
+            "https://opens3.example.com",
+            ("https://opens3.example.com", "opens3.example.com"),
+        ),
+    ],
+)
+def test_normalize_endpoint(endpoint, expected):
+    """Test that endpoints gain a protocol and lose trailing slashes."""
+    assert s3_auth_middleware._normalize_endpoint(endpoint) == expected
+
+
+def test_mask_password():
+    """Test that only the ends of a password are shown."""
+    assert s3_auth_middleware._mask_password("secret123") == "se*****23"
+    assert s3_auth_middleware._mask_password("abcd") == "****"
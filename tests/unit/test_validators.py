@@ -0,0 +1,52 @@
+"""
+Unit tests for OpenAthena configuration validators.
+"""
+
+import pytest
+
+from open_athena.validators import (
+    validate_memory_limit,
+    validate_port,
+    validate_region,
+    validate_row_limit,
+    validate_threads,
+)
+
+
+@pytest.mark.parametrize("value", ["4GB", "512MiB", "1.5 GB", "80%"])
+def test_validate_memory_limit_accepts_sizes(value):
+    """Test that valid memory limits are accepted."""
+    assert validate_memory_limit(value) == value
+
+
+@pytest.mark.parametrize("value", ["", "4XB", "4GB'; DROP TABLE t; --"])
+def test_validate_memory_limit_rejects_invalid(value):
+    """Test that malformed memory limits are rejected."""
+    with pytest.raises(ValueError):
+        validate_memory_limit(value)
+
+
+def test_validate_region():
+    """Test validating S3 region names."""
+    assert validate_region("us-east-1") == "us-east-1"
+    assert validate_region("garage") == "garage"
+    with pytest.raises(ValueError):
+        validate_region("us-east-1'")
+
+
+def test_validate_threads_and_port():
+    """Test validating integer settings."""
+    assert validate_threads("8") == 8
+    assert validate_port("8000") == 8000
+    with pytest.raises(ValueError):
+        validate_threads(0)
+    with pytest.raises(ValueError):
+        validate_port(70000)
+
+
+def test_validate_row_limit():
+    """Test that row limits of 0 and above are accepted."""
+    assert validate_row_limit("0") == 0
+    assert validate_row_limit(20) == 20
+    with pytest.raises(ValueError):
+        validate_row_limit("-1")
@@ -6,19 +6,55 @@ This module provides helper functions for testing S3/OpenS3 connectivity
 and data access in OpenAthena tests.
 """
 
+import functools
 import os
+import shutil
 import tempfile
 import uuid
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
 
+# Shared session so sweeps over many buckets reuse connections to the server
+# instead of opening a new one per request
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+# Most objects a CSV search asks for per bucket; servers that do not support
+# the parameter return the full listing
+LISTING_LIMIT = 1000
+
+
+@functools.lru_cache(maxsize=8)
+def _auth(access_key: str, secret_key: str) -> HTTPBasicAuth:
+    """Return a shared basic auth object for a set of credentials."""
+    return HTTPBasicAuth(access_key, secret_key)
+
+
+@functools.lru_cache(maxsize=1)
 def get_s3_credentials() -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Get S3/OpenS3 credentials from environment variables.
 
+    The environment is read once per test session; call
+    get_s3_credentials.cache_clear() after changing it.
+
     Returns:
         Tuple of (endpoint, access_key, secret_key)
     """
@@ -48,9 +84,7 @@ def list_buckets(endpoint: str, access_key: str, secret_key: str) -> List[str]:
     Raises:
         Exception if the request fails
     """
-    response = requests.get(
-        f"{endpoint}/buckets", auth=HTTPBasicAuth(access_key, secret_key)
-    )
+    response = _SESSION.get(f"{endpoint}/buckets", auth=_auth(access_key, secret_key))
 
     if response.status_code != 200:
         raise Exception(
@@ -77,102 +111,77 @@ def find_csv_in_bucket(
         Dict with file information or None if no CSV file is found
     """
     try:
-        response = requests.get(
+        response = _SESSION.get(
             f"{endpoint}/buckets/{bucket}/objects",
-            auth=HTTPBasicAuth(access_key, secret_key),
+            params={"limit": LISTING_LIMIT},
+            auth=_auth(access_key, secret_key),
         )
 
         if response.status_code != 200:
             return None
 
-        objects = response.json().get("objects", [])
-        for obj in objects:
-            if obj["key"].lower().endswith(".csv"):
-                return obj
+        # The listing API has no suffix filter, so the whole listing is
+        # decoded; orjson does that several times faster than the json module
+        if orjson is not None:
+            objects = orjson.loads(response.content).get("objects", [])
+        else:
+            objects = response.json().get("objects", [])
 
-        return None
+        # Lower-case only the last four characters instead of every key
+        return next(
+            (obj for obj in objects if obj["key"][-4:].lower() == ".csv"), None
+        )
     except Exception:
         return None
 
 
 def download_file(
-    endpoint: str, access_key: str, secret_key: str, bucket: str, file_key: str
-) -> Tuple[Optional[bytes], Optional[str]]:
+    endpoint: str,
+    access_key: str,
+    secret_key: str,
+    bucket: str,
+    file_key: str,
+    dest_dir: Optional[Path] = None,
+) -> Optional[str]:
     """
     Download a file from S3/OpenS3 and store in a temporary location.
 
+    The body is streamed to disk rather than held in memory. Pass pytest's
+    tmp_path as dest_dir so the file is removed with the test's directory.
+
     Args:
         endpoint: S3/OpenS3 endpoint URL
         access_key: Access key ID
         secret_key: Secret access key
         bucket: Bucket name
         file_key: File key (path)
+        dest_dir: Directory to write the file to; a named temporary file is
+            created (and left for the caller to remove) when omitted
 
     Returns:
-        Tuple of (file_content, temp_file_path) or (None, None) if download fails
+        Path of the downloaded file, or None if the download fails
     """
     try:
-        response = requests.get(
+        with _SESSION.get(
             f"{endpoint}/buckets/{bucket}/objects/{file_key}",
-            auth=HTTPBasicAuth(access_key, secret_key),
-        )
-
-        if response.status_code != 200:
-            return None, None
-
-        # Create a temporary file with a safe name
-        temp_dir = tempfile.gettempdir()
-        safe_filename = f"openathena_test_{uuid.uuid4().hex[:8]}.csv"
-        temp_file = os.path.join(temp_dir, safe_filename)
-
-        # Save the content
-        with open(temp_file, "wb") as f:
-            f.write(response.content)
-
-        return response.content, temp_file
+            auth=_auth(access_key, secret_key),
+            stream=True,
+        ) as response:
+            if response.status_code != 200:
+                return None
+
+            if dest_dir is None:
+                f = tempfile.NamedTemporaryFile(
+                    prefix="openathena_test_", suffix=".csv", delete=False
+                )
+            else:
+                f = open(Path(dest_dir) / f"dl_{uuid.uuid4().hex[:8]}.csv", "wb")
+
+            # Save the content; decode_content undoes any transfer encoding
+            response.raw.decode_content = True
+            with f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
+
+        return f.name
     except Exception:
-        return None, None
-
-
-def create_safe_path(file_path: str) -> str:
-    """
-    Create a path that is safe for DuckDB to use in SQL queries.
-    Handles special characters like apostrophes that might cause SQL syntax errors.
-
-    Args:
-        file_path: Original file path
-
-    Returns:
-        Safe path for DuckDB
-    """
-    # Use forward slashes for consistency
-    safe_path = file_path.replace("\\", "/")
-
-    # Handle paths with special characters by using a temp file if needed
-    if "'" in safe_path or "-" in safe_path or " " in safe_path:
-        temp_dir = tempfile.gettempdir()
-        safe_filename = f"openathena_test_{uuid.uuid4().hex[:8]}.csv"
-        temp_file = os.path.join(temp_dir, safe_filename).replace("\\", "/")
-
-        # Copy the file to a safe location if it exists
-        if os.path.exists(file_path):
-            import shutil
-
-            shutil.copy2(file_path, temp_file)
-            return temp_file
-
-    return safe_path
-
-
-def cleanup_temp_file(file_path: Optional[str]) -> None:
-    """
-    Clean up a temporary file if it exists.
-
-    Args:
-        file_path: Path to temporary file
-    """
-    if file_path and os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-        except Exception:
-            pass  # Ignore errors during cleanup
+        return None